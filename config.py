@@ -1,12 +1,11 @@
 # config.py
 import os
+import functools
 from datetime import timedelta
-from dotenv import load_dotenv
 
-# 强制加载.env（绝对路径）
+# .env绝对路径（首次读取数据库配置时才加载，见get_db_config）
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 ENV_PATH = os.path.join(PROJECT_ROOT, ".env")
-load_dotenv(dotenv_path=ENV_PATH, override=True)
 
 # ========== 基础请求配置 ==========
 BASE_URL = "https://prts.wiki"
@@ -18,7 +17,19 @@ HEADERS = {
 # ========== Playwright配置（干员详情解析用） ==========
 PLAYWRIGHT_CONFIG = {
     "headless": True,  # 调试时改为False，可看到浏览器操作
+    "concurrency": 4,  # 批量同步时同时解析的干员页面数
+    "restart_every": 20,  # 每同步N个干员重启一次浏览器（释放内存）
+    "rate_limit": {"max_rate": 2, "time_period": 1.0},  # 详情页请求令牌桶：每time_period秒最多max_rate次（防反爬）
     "browser_args": ["--no-sandbox", "--disable-dev-shm-usage"],  # 适配Linux/Windwos
+    # 解析用不到的资源类型直接abort（样式表保留：提示框显隐依赖CSS）
+    "blocked_resources": ["image", "font", "media"],
+    # 统计/广告脚本按URL片段abort（与解析无关，且会拖慢load事件）
+    "blocked_url_patterns": [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+        "hm.baidu.com", "cnzz.com", "umeng.com", "clarity.ms"
+    ],
+    # 浏览器用户数据目录：设置后改用持久化上下文，磁盘HTTP缓存跨运行复用（此模式不支持run_many(isolated=True)）
+    "user_data_dir": None,  # 例："./output/.browser_profile"
     "timeout": {
         "page_load": timedelta(seconds=30).total_seconds() * 1000,  # 30秒，增加页面加载超时
         "locator_wait": timedelta(seconds=5).total_seconds() * 1000,  # 5秒，增加定位器等待
@@ -42,6 +53,7 @@ PLAYWRIGHT_CONFIG = {
 OPERATOR_LIST_CONFIG = {
     "url": f"{BASE_URL}/w/干员一览",
     "json_output": "operators.json",
+    "sort_output": False,  # 保存前排序：稀有度降序→中文名拼音升序（安装pypinyin时按拼音，否则按码位）
     # 原始属性→规范字段映射（保留字段含义注释）
     "attr_mapping": {
         'data-zh': 'name_cn',          # 干员中文名
@@ -56,16 +68,36 @@ OPERATOR_LIST_CONFIG = {
 }
 
 # ========== 数据库配置（默认值，优先读.env） ==========
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": int(os.getenv("DB_PORT", 3306)),
-    "user": os.getenv("DB_USER", "root"),
-    "password": os.getenv("DB_PASSWORD", ""),
-    "database": os.getenv("DB_NAME", "arknights"),
-    "charset": "utf8mb4"
+@functools.cache
+def get_db_config() -> dict:
+    """数据库连接配置（延迟到首次连库时才解析.env，纯爬取流程不加载）"""
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=ENV_PATH, override=True)  # 强制加载.env
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", 3306)),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("DB_NAME", "arknights"),
+        "charset": "utf8mb4",
+        "use_pure": False,  # 使用C扩展，减少executemany的Python层打包开销
+        "autocommit": False,
+        "raise_on_warnings": False,
+        "consume_results": True,  # 自动读完未消费的结果集，避免Unread result报错
+        "allow_local_infile": True  # 允许LOAD DATA LOCAL INFILE（大批量导入用）
+    }
+
+DB_POOL_CONFIG = {
+    "pool_name": "ark",
+    "pool_size": 16,  # 连接池大小（mysql-connector上限32）
+    "pool_reset_session": False  # 归还连接时不做COM_RESET_CONNECTION（本项目不依赖会话级状态）
 }
+DB_BATCH_SIZE = 10000  # executemany单批行数（超出则分批提交）
+DB_INFILE_THRESHOLD = 500  # 行数超过该值时改用LOAD DATA LOCAL INFILE
+DB_FLUSH_SIZE = 50  # 批量同步干员详情时，每缓冲N个干员合并写入一次（一个事务）
 
 # ========== 输出配置 ==========
 #是支持相对路径的
 LOG_FILE = "./log/prts_parse_debug.log"
-JSON_OUTPUT_DIR = "./output"  # JSON输出目录
\ No newline at end of file
+JSON_OUTPUT_DIR = "./output"  # JSON输出目录
+HTTP_CACHE_DIR = "./output/.http_cache"  # 静态页面条件请求缓存（ETag/Last-Modified）
\ No newline at end of file
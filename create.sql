@@ -79,7 +79,9 @@ CREATE TABLE operator_talent_detail (
     create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '入库时间',
     update_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     -- 外键关联：删除/更新天赋时同步删除/更新详情（注释用-- 说明）
-    FOREIGN KEY (talent_id) REFERENCES operator_talent(id) ON DELETE CASCADE ON UPDATE CASCADE
+    FOREIGN KEY (talent_id) REFERENCES operator_talent(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    -- 级联删除按talent_id走索引范围扫描（显式命名，不依赖外键自动建索引）
+    INDEX idx_talent_id (talent_id)
 ) COMMENT '干员天赋详情表（不同触发条件的效果）';
 
 /* 5. 干员技能表（技能主信息） */
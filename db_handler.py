@@ -1,164 +1,459 @@
-import mysql.connector
-from mysql.connector import Error
-from config import DB_CONFIG
+import functools
+import itertools
+import os
+import sys
+import tempfile
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from config import get_db_config, DB_POOL_CONFIG, DB_BATCH_SIZE, DB_INFILE_THRESHOLD
 from utils import logger
 
+# ========== SQL语句（模块加载时构造一次） ==========
+_SQL_COUNT_BASE = "SELECT COUNT(*) FROM operator_base"
+_SQL_INSERT_BASE = """
+INSERT INTO operator_base (
+    name_cn, rarity, profession, sub_profession, faction, hidden_faction,
+    gender, position, tags, branch_description, trait_details,
+    redployment_time, initial_deployment_cost, block_count, attack_interval
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    id = LAST_INSERT_ID(id)
+"""
+_SQL_UPSERT_ATTR = """
+INSERT INTO operator_attr (
+    name_cn, attr_type, max_hp, atk, def, res
+) VALUES (%s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    max_hp = VALUES(max_hp),
+    atk = VALUES(atk),
+    def = VALUES(def),
+    res = VALUES(res)
+"""
+_SQL_INSERT_TALENT_PREFIX = """
+INSERT INTO operator_talent (
+    name_cn, talent_type, talent_name, remarks
+) VALUES """
+_SQL_INSERT_TALENT_DETAIL = """
+INSERT INTO operator_talent_detail (
+    talent_id, trigger_condition, description, potential_enhancement
+) VALUES (%s, %s, %s, %s)
+"""
+_SQL_INSERT_SKILL_PREFIX = """
+INSERT INTO operator_skill (
+    name_cn, skill_number, skill_name, skill_type, unlock_condition, remark
+) VALUES """
+_SQL_INSERT_SKILL_LEVEL = """
+INSERT INTO operator_skill_level (
+    skill_id, level, description, initial_sp, sp_cost, duration
+) VALUES (%s, %s, %s, %s, %s, %s)
+"""
+_SQL_UPSERT_TERM = """
+INSERT INTO global_terms (
+    term_name, term_explanation
+) VALUES (%s, %s)
+ON DUPLICATE KEY UPDATE
+    term_explanation = VALUES(term_explanation)
+"""
+_SQL_INSERT_TERM_RELATION = """
+INSERT INTO operator_term_relation (
+    name_cn, term_name, relation_module, module_id
+) VALUES (%s, %s, %s, %s)
+"""
+_SQL_UPSERT_BASE_LIST = """
+INSERT INTO operator_base (
+    name_cn, rarity, profession, sub_profession, faction,
+    gender, position, tags
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    rarity = VALUES(rarity),
+    profession = VALUES(profession),
+    sub_profession = VALUES(sub_profession),
+    faction = VALUES(faction),
+    gender = VALUES(gender),
+    position = VALUES(position),
+    tags = VALUES(tags)
+"""
+_SQL_UPSERT_BASE_DETAIL = """
+INSERT INTO operator_base (
+    name_cn, rarity, profession, sub_profession, faction, hidden_faction,
+    gender, position, tags, branch_description, trait_details,
+    redployment_time, initial_deployment_cost, block_count, attack_interval
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    sub_profession = VALUES(sub_profession),
+    branch_description = VALUES(branch_description),
+    trait_details = VALUES(trait_details),
+    redployment_time = VALUES(redployment_time),
+    initial_deployment_cost = VALUES(initial_deployment_cost),
+    block_count = VALUES(block_count),
+    attack_interval = VALUES(attack_interval)
+"""
+_SQL_DELETE_TALENT = "DELETE FROM operator_talent WHERE name_cn = %s"
+_SQL_DELETE_SKILL = "DELETE FROM operator_skill WHERE name_cn = %s"
+_SQL_DELETE_TERM_RELATION = "DELETE FROM operator_term_relation WHERE name_cn = %s"
+_SQL_COUNT_TERMS = "SELECT COUNT(*) FROM global_terms"
+_SQL_SELECT_ALL_BASE = "SELECT * FROM operator_base"
+_SQL_SELECT_ALL_NAMES = "SELECT name_cn FROM operator_base WHERE name_cn IS NOT NULL AND TRIM(name_cn) <> ''"
+_SQL_AUTOINC_INCREMENT = "SELECT @@auto_increment_increment"
+
+# 多行VALUES占位组（按行数缓存拼接结果，热路径上不再重复构造SQL字符串）
+_ROW_PLACEHOLDER_TALENT = "(" + ", ".join(["%s"] * 4) + ")"
+_ROW_PLACEHOLDER_SKILL = "(" + ", ".join(["%s"] * 6) + ")"
+
+@functools.lru_cache(maxsize=16)
+def _multirow_talent_sql(n: int) -> str:
+    return _SQL_INSERT_TALENT_PREFIX + ",".join([_ROW_PLACEHOLDER_TALENT] * n)
+
+@functools.lru_cache(maxsize=16)
+def _multirow_skill_sql(n: int) -> str:
+    return _SQL_INSERT_SKILL_PREFIX + ",".join([_ROW_PLACEHOLDER_SKILL] * n)
+
+@functools.lru_cache(maxsize=16)
+def _in_placeholders(n: int) -> str:
+    return "(" + ", ".join(["%s"] * n) + ")"
+
+@functools.lru_cache(maxsize=16)
+def _delete_stale_attr_sql(n: int) -> str:
+    """删除干员不在本次属性类型列表中的旧属性行"""
+    return "DELETE FROM operator_attr WHERE name_cn = %s AND attr_type NOT IN " + _in_placeholders(n)
+
+@functools.lru_cache(maxsize=64)
+def _delete_in_sql(table: str, n: int) -> str:
+    return f"DELETE FROM {table} WHERE name_cn IN ({', '.join(['%s'] * n)})"
+
+# operator_base插入字段顺序（与_SQL_INSERT_BASE一致）及缺省值（hidden_faction与表默认值一致）
+_BASE_FIELDS = (
+    "name_cn", "rarity", "profession", "sub_profession", "faction", "hidden_faction",
+    "gender", "position", "tags", "branch_description", "trait_details",
+    "redployment_time", "initial_deployment_cost", "block_count", "attack_interval"
+)
+_EMPTY = sys.intern("")
+_NONE_ZH = sys.intern("无")
+_BASE_DEFAULTS = dict.fromkeys(_BASE_FIELDS[1:], _EMPTY)
+_BASE_DEFAULTS["hidden_faction"] = _NONE_ZH
+
+def _tags_to_str(tags) -> str:
+    """标签列表转空格分隔字符串（已是字符串则原样返回）"""
+    return " ".join(tags) if isinstance(tags, list) else (tags or _EMPTY)
+
+def _base_row(info: dict) -> tuple:
+    """干员基础信息dict → operator_base插入参数（按_BASE_FIELDS顺序，缺省值已填充）"""
+    row = {**_BASE_DEFAULTS, **info}
+    row["tags"] = _tags_to_str(row["tags"])
+    return tuple(row[field] for field in _BASE_FIELDS)
+
+# LOAD DATA默认转义规则：反斜杠、制表符、换行需转义，NULL写作\N
+_INFILE_ESCAPE = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def _chunked(iterable, size):
+    """按size切分任意可迭代对象（不预先物化整个序列）"""
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+def _infile_field(value) -> str:
+    """单个字段转为LOAD DATA文本格式"""
+    if value is None:
+        return "\\N"
+    return str(value).translate(_INFILE_ESCAPE)
+
+# ========== 预处理后的干员入库行（纯Python、可pickle，可在子进程中构造） ==========
+# base: operator_base参数；attr_rows/term_rows: 对应表参数；
+# talent_rows/skill_rows: [(主表参数, [明细参数（不含外键ID）]), ...]
+PreparedOp = namedtuple("PreparedOp", "base attr_rows talent_rows skill_rows term_rows")
+
+def prepare_operator(op: dict) -> PreparedOp:
+    """干员dict（base_info/attr_list/talents/skills/term_relations）→ PreparedOp"""
+    name_cn = op["base_info"]["name_cn"]
+    return PreparedOp(
+        base=_base_row(op["base_info"]),
+        attr_rows=[
+            (name_cn, a["attr_type"], a.get("max_hp", ""), a.get("atk", ""), a.get("def", ""), a.get("res", ""))
+            for a in op.get("attr_list") or []
+        ],
+        talent_rows=[
+            (
+                (name_cn, t.get("talent_type", "第一天赋"), t.get("talent_name", ""), t.get("remarks", "")),
+                [
+                    (d.get("trigger_condition", ""), d.get("description", ""), d.get("potential_enhancement", ""))
+                    for d in t.get("details", [])
+                ]
+            )
+            for t in op.get("talents") or []
+        ],
+        skill_rows=[
+            (
+                (name_cn, s.get("skill_number", 1), s.get("skill_name", ""), s.get("skill_type", ""),
+                 s.get("unlock_condition", ""), s.get("remark", "")),
+                [
+                    (lv.get("level", ""), lv.get("description", ""), lv.get("initial_sp", ""),
+                     lv.get("sp_cost", ""), lv.get("duration", ""))
+                    for lv in s.get("skill_levels", [])
+                ]
+            )
+            for s in op.get("skills") or []
+        ],
+        term_rows=[
+            (name_cn, r["term_name"], r.get("relation_module", ""), r.get("module_id", ""))
+            for r in op.get("term_relations") or []
+        ]
+    )
+
+@functools.cache
+def _mysql():
+    """延迟导入mysql-connector（仅在真正连库时加载驱动）"""
+    import mysql.connector
+    import mysql.connector.pooling
+    return mysql.connector
+
 class DBHandler:
+    # ========== 类属性（进程内共享连接池） ==========
+    _pool = None
+    _pool_lock = threading.Lock()
+
     def __init__(self):
-        self.config = DB_CONFIG
+        self.config = get_db_config()
         self.connection = None
         self.connected = False  # 新增：标记连接状态
+        self._tx_depth = 0  # 显式事务嵌套层数（>0时insert_*不再单独提交）
+        self._tx_failed = False  # 事务内是否有操作失败
+        self._stmt_cache = {}  # SQL文本 → 预处理游标（随连接生命周期）
+        self._autoinc_step = None  # 会话的auto_increment_increment（随连接生命周期，首次多行INSERT后查询一次）
+
+    @classmethod
+    def _get_pool(cls):
+        """获取全局连接池（首次调用时创建，线程安全）"""
+        with cls._pool_lock:
+            if cls._pool is None:
+                cls._pool = _mysql().pooling.MySQLConnectionPool(**DB_POOL_CONFIG, **get_db_config())
+                logger.info("✅ 数据库连接池初始化完成（大小：%s）", DB_POOL_CONFIG['pool_size'])
+        return cls._pool
 
     def connect(self):
-        """建立数据库连接"""
+        """建立数据库连接（从连接池取出）"""
         try:
-            self.connection = mysql.connector.connect(**self.config)
+            self.connection = self._get_pool().get_connection()
             if self.connection.is_connected():
                 self.connected = True  # 标记为已连接
                 logger.info("✅ 数据库连接成功（适配新表结构）")
                 return True
-        except Error as e:
+        except _mysql().Error as e:
             self.connected = False  # 连接失败标记为未连接
-            logger.error(f"❌ 数据库连接失败: {str(e)}")
+            logger.error("❌ 数据库连接失败: %s", e)
         return False
 
     def close(self):
-        """关闭数据库连接"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """关闭数据库连接（池化连接close即归还连接池；pool_reset_session=False，归还前先回滚未提交事务）"""
+        self._close_prepared()
+        self._autoinc_step = None
         self.connected = False  # 关闭后标记为未连接
+        if not self.connection:
+            return  # 已关闭：重复调用不再二次归还同一连接
+        try:
+            self.connection.rollback()  # 否则下一个取到该连接的调用方会继承未结束的事务
+        except _mysql().Error as e:
+            logger.warning("⚠️ 归还连接前回滚失败：%s", e)
+        try:
+            self.connection.close()
+        except _mysql().Error as e:
+            logger.warning("⚠️ 关闭数据库连接时警告：%s", e)
+        self.connection = None
         logger.info("🔌 数据库连接已关闭")
 
     # ========== 新增：检查连接状态方法 ==========
     def is_connected(self):
-        """检查数据库连接是否有效"""
+        """检查连接状态（仅读本地标记，不发PING；连接是否真的存活由失败路径上的ping()判断）"""
+        return bool(self.connected and self.connection)
+
+    def ping(self):
+        """向服务端发PING确认连接存活（有网络往返，只在写入失败后调用）"""
+        if not self.connection:
+            return False
         try:
-            # 双重校验：标记位 + 实际连接状态
-            return self.connected and self.connection and self.connection.is_connected()
-        except Exception:
+            self.connection.ping(reconnect=False)
+            return True
+        except _mysql().Error:
             self.connected = False
             return False
 
     # ========== 新增：重新连接方法 ==========
     def reconnect(self):
-        """重新连接数据库（关闭旧连接后重试）"""
+        """重新连接数据库（先由驱动原地重连，失败再归还旧连接、从池中重新取）"""
         logger.warning("🔄 尝试重新连接数据库...")
+        self._close_prepared()  # 服务端预处理语句随旧会话失效
+        self._autoinc_step = None
+        if self.connection:
+            try:
+                self.connection.ping(reconnect=True, attempts=3, delay=1)
+                self.connected = True
+                logger.info("✅ 数据库重连成功")
+                return True
+            except _mysql().Error as e:
+                logger.warning("⚠️ 原地重连失败，改从连接池重新取连接：%s", e)
         self.close()  # 先关闭旧连接
         return self.connect()  # 重新建立连接
 
+    # ========== 预处理语句缓存 ==========
+    def _prepared(self, sql):
+        """按SQL文本复用服务端预处理语句（同一连接上只PREPARE一次，后续仅EXECUTE）"""
+        cursor = self._stmt_cache.get(sql)
+        if cursor is None:
+            cursor = self.connection.cursor(prepared=True)
+            self._stmt_cache[sql] = cursor
+        return cursor
+
+    def _close_prepared(self):
+        """释放当前连接上缓存的预处理语句"""
+        for cursor in self._stmt_cache.values():
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        self._stmt_cache.clear()
+
+    # ========== 事务控制：批量写入只提交一次 ==========
+    @contextmanager
+    def transaction(self):
+        """显式事务（with db.transaction(): 内的insert_*共用一次COMMIT，任一失败则整体回滚）"""
+        if self._tx_depth == 0:
+            self._tx_failed = False
+            if not self.connection.in_transaction:
+                self.connection.start_transaction()
+        self._tx_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._tx_failed = True
+            raise
+        finally:
+            self._tx_depth -= 1
+            if self._tx_depth == 0:
+                if self._tx_failed:
+                    self.connection.rollback()
+                    logger.warning("⚠️ 事务内存在失败操作，已整体回滚")
+                else:
+                    self.connection.commit()
+
+    def _commit(self):
+        """提交（处于显式事务中时延迟到事务结束统一提交）"""
+        if self._tx_depth == 0:
+            self.connection.commit()
+
+    def _rollback(self):
+        """回滚（处于显式事务中时仅标记失败，由事务结束时统一回滚）"""
+        if self._tx_depth == 0:
+            self.connection.rollback()
+        else:
+            self._tx_failed = True
+
+    def _executemany(self, cursor, sql, values_list, batch_size=DB_BATCH_SIZE):
+        """分批executemany（每批最多batch_size行，避免单包超出max_allowed_packet）"""
+        # mysql-connector对"INSERT ... VALUES (...)"形式的executemany会改写为单条多行VALUES语句，
+        # 与PyMySQL/MySQLdb的快速路径一致；SQL须保持单个VALUES(...)占位组，不要手工拼接多行
+        for start in range(0, len(values_list), batch_size):
+            cursor.executemany(sql, values_list[start:start + batch_size])
+
+    def _inserted_ids(self, cursor, n: int) -> range:
+        """多行INSERT刚插入的n行自增ID（须紧接INSERT调用）"""
+        # 同一条多行简单INSERT分配的ID在任意innodb_autoinc_lock_mode下都连续分配，
+        # 但步长为auto_increment_increment（多主/Galera集群中常大于1），不能假定为1
+        first_id = cursor.lastrowid
+        if self._autoinc_step is None:
+            step_cursor = self.connection.cursor()
+            try:
+                step_cursor.execute(_SQL_AUTOINC_INCREMENT)
+                self._autoinc_step = step_cursor.fetchone()[0]
+            finally:
+                step_cursor.close()
+        return range(first_id, first_id + n * self._autoinc_step, self._autoinc_step)
+
+    def bulk_load_via_infile(self, table: str, columns: list[str], rows, update_columns: list[str]):
+        """LOAD DATA LOCAL INFILE批量导入（先载入临时表，再INSERT ... SELECT合并，保留ON DUPLICATE KEY UPDATE语义）"""
+        # 不直接REPLACE INTO目标表：REPLACE会先删行，触发operator_base上的外键级联删除
+        staging = f"tmp_{table}_load"
+        col_sql = ", ".join(columns)
+        update_sql = ", ".join(f"{col} = VALUES({col})" for col in update_columns)
+        cursor = self.connection.cursor()
+        tmp = tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=".tsv", delete=False)
+        try:
+            with tmp:
+                for row in rows:
+                    tmp.write("\t".join(_infile_field(v) for v in row) + "\n")
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+            cursor.execute(f"CREATE TEMPORARY TABLE {staging} LIKE {table}")
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {staging} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({col_sql})",
+                (tmp.name,)
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({col_sql}) SELECT {col_sql} FROM {staging} "
+                f"ON DUPLICATE KEY UPDATE {update_sql}"
+            )
+            return True
+        except _mysql().Error as e:
+            # 服务端未开启local_infile等情况，由调用方回退到executemany
+            logger.warning("⚠️ LOAD DATA导入%s失败，回退到批量INSERT: %s", table, e)
+            return False
+        finally:
+            try:
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+            except _mysql().Error:
+                pass
+            cursor.close()
+            os.remove(tmp.name)
+
     def count_operators(self):
         """统计干员基础信息数量"""
         cursor = self.connection.cursor()
         try:
-            cursor.execute("SELECT COUNT(*) FROM operator_base")
+            cursor.execute(_SQL_COUNT_BASE)
             result = cursor.fetchone()
             if result:
                 return result[0]
-        except Error as e:
-            logger.error(f"❌ 统计基础信息数量失败: {str(e)}")
+        except _mysql().Error as e:
+            logger.error("❌ 统计基础信息数量失败: %s", e)
         finally:
             cursor.close()
         return 0
 
     def insert_operator_base(self, base_info):
-        """插入干员基础信息（适配operator_base表结构）"""
-        cursor = self.connection.cursor()
+        """插入干员基础信息（适配operator_base表结构；已存在则不改动，返回已有ID）"""
         try:
-            # 检查是否已存在（基于唯一键name_cn）
-            cursor.execute("SELECT id FROM operator_base WHERE name_cn = %s", (base_info["name_cn"],))
-            result = cursor.fetchone()
-            if result:
-                logger.warning(f"⚠️ 干员 {base_info['name_cn']} 已存在，跳过基础信息插入")
-                return result[0]
-
-            # 插入新干员（严格匹配operator_base字段）
-            sql = """
-            INSERT INTO operator_base (
-                name_cn, rarity, profession, sub_profession, faction, hidden_faction,
-                gender, position, tags, branch_description, trait_details,
-                redployment_time, initial_deployment_cost, block_count, attack_interval
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                base_info["name_cn"],
-                base_info.get("rarity", ""),
-                base_info.get("profession", ""),
-                base_info.get("sub_profession", ""),
-                base_info.get("faction", ""),
-                base_info.get("hidden_faction", ""),
-                base_info.get("gender", ""),
-                base_info.get("position", ""),
-                " ".join(base_info.get("tags", [])) if isinstance(base_info.get("tags"), list) else base_info.get("tags", ""),
-                base_info.get("branch_description", ""),
-                base_info.get("trait_details", ""),
-                base_info.get("redployment_time", ""),
-                base_info.get("initial_deployment_cost", ""),  # 保留15→17这类字符串
-                base_info.get("block_count", ""),
-                base_info.get("attack_interval", "")
-            )
-            cursor.execute(sql, values)
-            self.connection.commit()
+            # 基于唯一键name_cn：冲突时以LAST_INSERT_ID(id)回传已有ID，一次往返取得ID
+            # 严格匹配operator_base字段，缺省值见_BASE_DEFAULTS
+            cursor = self._prepared(_SQL_INSERT_BASE)
+            cursor.execute(_SQL_INSERT_BASE, _base_row(base_info))
+            self._commit()
             operator_id = cursor.lastrowid
-            logger.info(f"✅ 插入干员基础信息: {base_info['name_cn']} (ID: {operator_id})")
+            if cursor.rowcount == 1:
+                logger.info("✅ 插入干员基础信息: %s (ID: %s)", base_info['name_cn'], operator_id)
+            else:
+                logger.warning("⚠️ 干员 %s 已存在，跳过基础信息插入", base_info['name_cn'])
             return operator_id
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 插入基础信息失败 {base_info['name_cn']}: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 插入基础信息失败 %s: %s", base_info['name_cn'], e)
             return None
-        finally:
-            cursor.close()
 
     def update_operator_base(self, base_info):
-        """干员基础信息补充"""
+        """干员基础信息补充（单条INSERT ... ON DUPLICATE KEY UPDATE：已存在则更新详情字段，不存在则插入）"""
         if not self.is_connected():  # 改用新方法检查连接
             logger.error("❌ 数据库未连接，无法更新干员基础信息")
             return False
             
-        cursor = self.connection.cursor()
         try:
-            # 检查干员是否存在
-            cursor.execute("SELECT id FROM operator_base WHERE name_cn = %s", (base_info["name_cn"],))
-            result = cursor.fetchone()
-            if not result:
-                logger.warning(f"⚠️ 干员 {base_info['name_cn']} 不存在，无法更新")
-                return False
-                
-            sql = """
-            UPDATE operator_base 
-            SET 
-                sub_profession = %s,
-                branch_description = %s,
-                trait_details = %s,
-                redployment_time = %s,
-                initial_deployment_cost = %s,
-                block_count = %s,
-                attack_interval = %s
-            WHERE name_cn = %s
-            """
-            
-            # 准备参数（补充字段值 + 匹配的name_cn）
-            params = (
-                base_info.get("sub_profession", ""),  # 分支职业
-                base_info.get("branch_description", ""),  # 分支描述
-                base_info.get("trait_details", ""),  # 特性详情
-                base_info.get("redployment_time", ""),  # 再部署时间
-                base_info.get("initial_deployment_cost", ""),  # 初始部署费
-                base_info.get("block_count", ""),  # 阻挡数
-                base_info.get("attack_interval", ""),  # 攻击间隔
-                base_info["name_cn"]  # 匹配干员的唯一键
-            )
-            
-            cursor.execute(sql, params)
-            self.connection.commit()
-            logger.info(f"✅ 成功更新干员【{base_info['name_cn']}】的基础信息")
+            cursor = self._prepared(_SQL_UPSERT_BASE_DETAIL)
+            cursor.execute(_SQL_UPSERT_BASE_DETAIL, _base_row(base_info))
+            self._commit()
+            logger.info("✅ 成功更新干员【%s】的基础信息", base_info['name_cn'])
             return True
             
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 更新干员【{base_info['name_cn']}】失败：{str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 更新干员【%s】失败：%s", base_info['name_cn'], e)
             return False
-        finally:
-            cursor.close()
 
     def insert_operator_attr(self, name_cn, attr_list):
         """插入干员属性（适配operator_attr表结构）"""
@@ -172,14 +467,7 @@ class DBHandler:
             
         cursor = self.connection.cursor()
         try:
-            # 先删除旧数据（避免重复）
-            cursor.execute("DELETE FROM operator_attr WHERE name_cn = %s", (name_cn,))
-            
-            sql = """
-            INSERT INTO operator_attr (
-                name_cn, attr_type, max_hp, atk, def, res
-            ) VALUES (%s, %s, %s, %s, %s, %s)
-            """
+            # 基于唯一键(name_cn, attr_type)覆盖更新；本次未出现的旧属性类型在同一事务内删除
             # 保留字符串格式，不强制转int
             values_list = []
             for attr in attr_list:
@@ -193,13 +481,14 @@ class DBHandler:
                 )
                 values_list.append(values)
             
-            cursor.executemany(sql, values_list)
-            self.connection.commit()
-            logger.info(f"✅ 插入干员属性: {name_cn}（共{len(values_list)}条属性记录）")
+            cursor.execute(_delete_stale_attr_sql(len(values_list)), [name_cn, *(v[1] for v in values_list)])
+            self._executemany(cursor, _SQL_UPSERT_ATTR, values_list)
+            self._commit()
+            logger.info("✅ 插入干员属性: %s（共%s条属性记录）", name_cn, len(values_list))
             return True
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 插入属性失败 {name_cn}: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 插入属性失败 %s: %s", name_cn, e)
             return False
         finally:
             cursor.close()
@@ -216,49 +505,41 @@ class DBHandler:
             
         cursor = self.connection.cursor()
         try:
-            # 先删除旧数据
-            cursor.execute("DELETE FROM operator_talent WHERE name_cn = %s", (name_cn,))
-            cursor.execute("DELETE FROM operator_talent_detail WHERE talent_id IN (SELECT id FROM operator_talent WHERE name_cn = %s)", (name_cn,))
+            # 先删除旧数据（天赋详情由外键ON DELETE CASCADE级联删除）
+            cursor.execute(_SQL_DELETE_TALENT, (name_cn,))
             
-            # 插入天赋主信息
-            talent_ids = []
-            talent_sql = """
-            INSERT INTO operator_talent (
-                name_cn, talent_type, talent_name, remarks
-            ) VALUES (%s, %s, %s, %s)
-            """
-            for talent in talents:
-                cursor.execute(talent_sql, (
+            # 插入天赋主信息（单条多行VALUES，一次往返）
+            talent_sql = _multirow_talent_sql(len(talents))
+            talent_values = [
+                (
                     name_cn,
                     talent.get("talent_type", "第一天赋"),
                     talent.get("talent_name", ""),
                     talent.get("remarks", "")
-                ))
-                talent_id = cursor.lastrowid
-                talent_ids.append((talent_id, talent))
+                )
+                for talent in talents
+            ]
+            cursor.execute(talent_sql, list(itertools.chain.from_iterable(talent_values)))
+            talent_ids = zip(self._inserted_ids(cursor, len(talents)), talents)
             
             # 插入天赋详情
-            detail_sql = """
-            INSERT INTO operator_talent_detail (
-                talent_id, trigger_condition, description, potential_enhancement
-            ) VALUES (%s, %s, %s, %s)
-            """
-            detail_values = []
-            for talent_id, talent in talent_ids:
-                for detail in talent.get("details", []):
-                    detail_values.append((
-                        talent_id,
-                        detail.get("trigger_condition", ""),
-                        detail.get("description", ""),
-                        detail.get("potential_enhancement", "")
-                    ))
-            cursor.executemany(detail_sql, detail_values)
-            self.connection.commit()
-            logger.info(f"✅ 插入干员天赋: {name_cn}（共{len(talents)}个天赋）")
+            detail_values = [
+                (
+                    talent_id,
+                    detail.get("trigger_condition", ""),
+                    detail.get("description", ""),
+                    detail.get("potential_enhancement", "")
+                )
+                for talent_id, talent in talent_ids
+                for detail in talent.get("details", [])
+            ]
+            self._executemany(cursor, _SQL_INSERT_TALENT_DETAIL, detail_values)
+            self._commit()
+            logger.info("✅ 插入干员天赋: %s（共%s个天赋）", name_cn, len(talents))
             return True
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 插入天赋失败 {name_cn}: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 插入天赋失败 %s: %s", name_cn, e)
             return False
         finally:
             cursor.close()
@@ -275,53 +556,45 @@ class DBHandler:
             
         cursor = self.connection.cursor()
         try:
-            # 先删除旧数据
-            cursor.execute("DELETE FROM operator_skill WHERE name_cn = %s", (name_cn,))
-            cursor.execute("DELETE FROM operator_skill_level WHERE skill_id IN (SELECT id FROM operator_skill WHERE name_cn = %s)", (name_cn,))
+            # 先删除旧数据（技能等级由外键ON DELETE CASCADE级联删除）
+            cursor.execute(_SQL_DELETE_SKILL, (name_cn,))
             
-            # 插入技能主信息
-            skill_ids = []
-            skill_sql = """
-            INSERT INTO operator_skill (
-                name_cn, skill_number, skill_name, skill_type, unlock_condition, remark
-            ) VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            for skill in skills:
-                cursor.execute(skill_sql, (
+            # 插入技能主信息（单条多行VALUES，一次往返）
+            skill_sql = _multirow_skill_sql(len(skills))
+            skill_values = [
+                (
                     name_cn,
                     skill.get("skill_number", 1),
                     skill.get("skill_name", ""),
                     skill.get("skill_type", ""),
                     skill.get("unlock_condition", ""),
                     skill.get("remark", "")
-                ))
-                skill_id = cursor.lastrowid
-                skill_ids.append((skill_id, skill))
+                )
+                for skill in skills
+            ]
+            cursor.execute(skill_sql, list(itertools.chain.from_iterable(skill_values)))
+            skill_ids = zip(self._inserted_ids(cursor, len(skills)), skills)
             
             # 插入技能等级
-            level_sql = """
-            INSERT INTO operator_skill_level (
-                skill_id, level, description, initial_sp, sp_cost, duration
-            ) VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            level_values = []
-            for skill_id, skill in skill_ids:
-                for level in skill.get("skill_levels", []):
-                    level_values.append((
-                        skill_id,
-                        level.get("level", ""),
-                        level.get("description", ""),
-                        level.get("initial_sp", ""),
-                        level.get("sp_cost", ""),
-                        level.get("duration", "")
-                    ))
-            cursor.executemany(level_sql, level_values)
-            self.connection.commit()
-            logger.info(f"✅ 插入干员技能: {name_cn}（共{len(skills)}个技能）")
+            level_values = [
+                (
+                    skill_id,
+                    level.get("level", ""),
+                    level.get("description", ""),
+                    level.get("initial_sp", ""),
+                    level.get("sp_cost", ""),
+                    level.get("duration", "")
+                )
+                for skill_id, skill in skill_ids
+                for level in skill.get("skill_levels", [])
+            ]
+            self._executemany(cursor, _SQL_INSERT_SKILL_LEVEL, level_values)
+            self._commit()
+            logger.info("✅ 插入干员技能: %s（共%s个技能）", name_cn, len(skills))
             return True
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 插入技能失败 {name_cn}: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 插入技能失败 %s: %s", name_cn, e)
             return False
         finally:
             cursor.close()
@@ -338,26 +611,23 @@ class DBHandler:
             
         cursor = self.connection.cursor()
         try:
-            sql = """
-            INSERT INTO global_terms (
-                term_name, term_explanation
-            ) VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE 
-                term_explanation = VALUES(term_explanation)
-            """
             values_list = []
             for term in terms:
                 values_list.append((
                     term["term_name"],
                     term.get("term_explanation", "")
                 ))
-            cursor.executemany(sql, values_list)
-            self.connection.commit()
-            logger.info(f"✅ 插入/更新全局术语（共{len(terms)}条）")
+            loaded = len(values_list) > DB_INFILE_THRESHOLD and self.bulk_load_via_infile(
+                "global_terms", ["term_name", "term_explanation"], values_list, ["term_explanation"]
+            )
+            if not loaded:
+                self._executemany(cursor, _SQL_UPSERT_TERM, values_list)
+            self._commit()
+            logger.info("✅ 插入/更新全局术语（共%s条）", len(terms))
             return True
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 插入术语失败: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 插入术语失败: %s", e)
             return False
         finally:
             cursor.close()
@@ -370,11 +640,11 @@ class DBHandler:
             
         cursor = self.connection.cursor()
         try:
-            cursor.execute("SELECT COUNT(*) FROM global_terms")
+            cursor.execute(_SQL_COUNT_TERMS)
             result = cursor.fetchone()
             return result[0]
-        except Error as e:
-            logger.error(f"❌ 统计全局术语数量失败: {str(e)}")
+        except _mysql().Error as e:
+            logger.error("❌ 统计全局术语数量失败: %s", e)
             return 0
         finally:
             cursor.close()
@@ -392,13 +662,8 @@ class DBHandler:
         cursor = self.connection.cursor()
         try:
             # 先删除旧关联
-            cursor.execute("DELETE FROM operator_term_relation WHERE name_cn = %s", (name_cn,))
+            cursor.execute(_SQL_DELETE_TERM_RELATION, (name_cn,))
             
-            sql = """
-            INSERT INTO operator_term_relation (
-                name_cn, term_name, relation_module, module_id
-            ) VALUES (%s, %s, %s, %s)
-            """
             values_list = []
             for relation in term_relations:
                 values_list.append((
@@ -407,67 +672,62 @@ class DBHandler:
                     relation.get("relation_module", ""),  # trait/天赋/技能
                     relation.get("module_id", "")         # 天赋1/技能3等
                 ))
-            cursor.executemany(sql, values_list)
-            self.connection.commit()
-            logger.info(f"✅ 插入干员术语关联: {name_cn}（共{len(term_relations)}条）")
+            self._executemany(cursor, _SQL_INSERT_TERM_RELATION, values_list)
+            self._commit()
+            logger.info("✅ 插入干员术语关联: %s（共%s条）", name_cn, len(term_relations))
             return True
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 插入术语关联失败 {name_cn}: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 插入术语关联失败 %s: %s", name_cn, e)
             return False
         finally:
             cursor.close()
 
-    def batch_insert_operator_base(self, ops_list: list[dict]):
-        """批量插入干员基础信息（从干员一览数据）"""
+    def batch_insert_operator_base(self, ops_iter, chunk_size=5000):
+        """批量插入干员基础信息（从干员一览数据；ops_iter可为任意可迭代对象，按chunk_size分批流式写入）"""
         if not self.is_connected():  # 改用新方法检查连接
             logger.error("❌ 数据库未连接，无法批量插入干员基础信息")
             return False
-            
-        if not ops_list:
-            logger.warning("⚠️ 干员列表为空，跳过批量插入")
-            return False
-            
+
+        # 逐行生成参数，不物化整个values_list
+        rows = (
+            (
+                op.get("name_cn", ""),
+                op.get("rarity", ""),
+                op.get("profession", ""),
+                op.get("sub_profession", ""),
+                op.get("faction", ""),
+                op.get("gender", ""),
+                op.get("position", ""),
+                op.get("tags", "")  # 保留原始逗号分隔的标签
+            )
+            for op in ops_iter
+        )
+
+        total = 0
         cursor = self.connection.cursor()
         try:
-            # 批量插入SQL（ON DUPLICATE KEY UPDATE 避免重复）
-            sql = """
-            INSERT INTO operator_base (
-                name_cn, rarity, profession, sub_profession, faction,
-                gender, position, tags
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                rarity = VALUES(rarity),
-                profession = VALUES(profession),
-                sub_profession = VALUES(sub_profession),
-                faction = VALUES(faction),
-                gender = VALUES(gender),
-                position = VALUES(position),
-                tags = VALUES(tags)
-            """
-            # 构造批量插入的参数列表
-            values_list = []
-            for op in ops_list:
-                values_list.append((
-                    op.get("name_cn", ""),
-                    op.get("rarity", ""),
-                    op.get("profession", ""),
-                    op.get("sub_profession", ""),
-                    op.get("faction", ""),
-                    op.get("gender", ""),
-                    op.get("position", ""),
-                    op.get("tags", "")  # 保留原始逗号分隔的标签
-                ))
-            
-            # 执行批量插入
-            cursor.executemany(sql, values_list)
-            self.connection.commit()
-            
-            logger.info(f"✅ 批量插入/更新干员基础信息（共{len(ops_list)}条）")
+            for chunk in _chunked(rows, chunk_size):
+                # 执行批量插入（大批量优先走LOAD DATA），每批提交一次
+                loaded = len(chunk) > DB_INFILE_THRESHOLD and self.bulk_load_via_infile(
+                    "operator_base",
+                    ["name_cn", "rarity", "profession", "sub_profession", "faction", "gender", "position", "tags"],
+                    chunk,
+                    ["rarity", "profession", "sub_profession", "faction", "gender", "position", "tags"]
+                )
+                if not loaded:
+                    self._executemany(cursor, _SQL_UPSERT_BASE_LIST, chunk)
+                self._commit()
+                total += len(chunk)
+
+            if not total:
+                logger.warning("⚠️ 干员列表为空，跳过批量插入")
+                return False
+            logger.info("✅ 批量插入/更新干员基础信息（共%s条）", total)
             return True
-        except Error as e:
-            self.connection.rollback()
-            logger.error(f"❌ 批量插入干员基础信息失败: {str(e)}")
+        except _mysql().Error as e:
+            self._rollback()
+            logger.error("❌ 批量插入干员基础信息失败（已提交%s条）: %s", total, e)
             return False
         finally:
             cursor.close()
@@ -480,15 +740,127 @@ class DBHandler:
             
         cursor = self.connection.cursor()
         try:
-            cursor.execute("SELECT * FROM operator_base")
+            cursor.execute(_SQL_SELECT_ALL_BASE)
             result = cursor.fetchall()
             return result
-        except Error as e:
-            logger.error(f"❌ 查询所有干员基础信息失败: {str(e)}")
+        except _mysql().Error as e:
+            logger.error("❌ 查询所有干员基础信息失败: %s", e)
+            return None
+        finally:
+            cursor.close()
+
+    def select_all_operator_names(self):
+        """查询所有干员名称（仅投影name_cn列）"""
+        if not self.is_connected():
+            logger.error("❌ 数据库未连接，无法查询干员名称")
+            return None
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(_SQL_SELECT_ALL_NAMES)
+            return [row[0].strip() for row in cursor.fetchall()]
+        except _mysql().Error as e:
+            logger.error("❌ 查询干员名称失败: %s", e)
             return None
         finally:
             cursor.close()
 
+    # ========== 多干员跨表批量入库 ==========
+    def _ingest_chunk(self, cursor, preps: list[PreparedOp]):
+        """单批干员写入全部明细表（每张表一条多行INSERT，由调用方负责事务）"""
+        # 只清理本次有新数据的干员的旧天赋/技能/术语关联（明细表由外键级联删除；未解析到的表保留旧数据）
+        for table, field in (("operator_talent", "talent_rows"), ("operator_skill", "skill_rows"),
+                             ("operator_term_relation", "term_rows")):
+            subset = [p.base[0] for p in preps if getattr(p, field)]
+            if subset:
+                cursor.execute(_delete_in_sql(table, len(subset)), subset)
+
+        # 1. 基础信息：不存在则插入，存在则仅补充详情字段（等价于update→insert回退）
+        self._executemany(cursor, _SQL_UPSERT_BASE_DETAIL, [p.base for p in preps])
+
+        # 2. 属性（先删除各干员本次未出现的旧属性类型，再覆盖更新）
+        for p in preps:
+            if p.attr_rows:
+                cursor.execute(_delete_stale_attr_sql(len(p.attr_rows)), [p.base[0], *(row[1] for row in p.attr_rows)])
+        self._executemany(cursor, _SQL_UPSERT_ATTR, [row for p in preps for row in p.attr_rows])
+
+        # 3. 天赋 + 天赋详情（整批一条多行INSERT，按lastrowid推导各行自增ID）
+        talents = [t for p in preps for t in p.talent_rows]
+        if talents:
+            cursor.execute(
+                _multirow_talent_sql(len(talents)),
+                list(itertools.chain.from_iterable(parent for parent, _ in talents))
+            )
+            detail_values = [
+                (talent_id, *detail)
+                for talent_id, (_, details) in zip(self._inserted_ids(cursor, len(talents)), talents)
+                for detail in details
+            ]
+            self._executemany(cursor, _SQL_INSERT_TALENT_DETAIL, detail_values)
+
+        # 4. 技能 + 技能等级
+        skills = [s for p in preps for s in p.skill_rows]
+        if skills:
+            cursor.execute(
+                _multirow_skill_sql(len(skills)),
+                list(itertools.chain.from_iterable(parent for parent, _ in skills))
+            )
+            level_values = [
+                (skill_id, *level)
+                for skill_id, (_, levels) in zip(self._inserted_ids(cursor, len(skills)), skills)
+                for level in levels
+            ]
+            self._executemany(cursor, _SQL_INSERT_SKILL_LEVEL, level_values)
+
+        # 5. 术语关联
+        self._executemany(cursor, _SQL_INSERT_TERM_RELATION, [row for p in preps for row in p.term_rows])
+
+    def ingest_operators(self, ops, chunk=50):
+        """多干员跨表批量入库（每chunk个干员一个事务、每张表一条多行INSERT；ops元素为PreparedOp或含base_info/attr_list/talents/skills/term_relations的dict）"""
+        if not self.is_connected():
+            logger.error("❌ 数据库未连接，无法批量入库干员")
+            return 0
+
+        success_count = failed_count = 0
+        cursor = self.connection.cursor()
+        try:
+            for batch in _chunked(ops, chunk):
+                preps = [op if isinstance(op, PreparedOp) else prepare_operator(op) for op in batch]
+                try:
+                    with self.transaction():
+                        self._ingest_chunk(cursor, preps)
+                    success_count += len(preps)
+                    logger.info("✅ 批量入库干员 %s 个（累计 %s）", len(preps), success_count)
+                except _mysql().Error as e:
+                    # 整批回滚后逐个重试：单个干员的坏数据不连累同批其他干员
+                    logger.warning("⚠️ 批量入库干员失败（本批 %s 个已回滚），改为逐个入库: %s", len(preps), e)
+                    # 连接中途断开导致的失败：先重连，否则逐个重试也只会全部失败
+                    if not self.ping():
+                        if not self.reconnect():
+                            failed_count += len(preps)
+                            break
+                        cursor = self.connection.cursor()  # 重连可能换了连接对象，游标随之重建
+                    ok = self._ingest_each(cursor, preps)
+                    success_count += ok
+                    failed_count += len(preps) - ok
+        finally:
+            cursor.close()
+        if failed_count:
+            logger.error("❌ 批量入库完成，%s 个干员入库失败", failed_count)
+        return success_count
+
+    def _ingest_each(self, cursor, preps: list[PreparedOp]) -> int:
+        """逐个干员单独事务写入（整批失败后的回退路径），返回成功个数"""
+        ok = 0
+        for prep in preps:
+            try:
+                with self.transaction():
+                    self._ingest_chunk(cursor, [prep])
+                ok += 1
+            except _mysql().Error as e:
+                logger.error("❌ 干员 %s 入库失败，已回滚: %s", prep.base[0], e)
+        return ok
+
 # 调用示例（可单独调试）
 if __name__ == "__main__":
     # 初始化DBHandler
@@ -1,11 +1,105 @@
 import asyncio
-import json
 import re
 from datetime import datetime
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
 from config import BASE_URL, PLAYWRIGHT_CONFIG, JSON_OUTPUT_DIR
-from utils import logger, clean_text, clean_desc, clean_filename, ensure_output_dir
+from utils import logger, clean_text, clean_desc, clean_filename, ensure_output_dir, dump_json
+
+# 预编译正则（每个术语/干员复用）
+_WS_RE = re.compile(r"\s+")
+_BRANCH_RE = re.compile("分支信息")
+_QUOTE_TBL = str.maketrans({'"': None, '“': None, '”': None})  # 表头去引号（单次translate）
+
+# 一次evaluate取回页面内已渲染的提示框内容（data-tip/title属性、提示框子节点或紧邻的兄弟节点），取不到的术语才回退到悬停
+# 键与_tip_key一致：去掉全部空白和“（+）”（bs4侧clean_text逐段strip拼接，与textContent的空白不同）
+_JS_INLINE_TIPS = """(tipSelectors) => {
+    const tips = {};
+    for (const el of document.querySelectorAll('#mw-content-text span[class*="mc-tooltips"]')) {
+        const name = (el.textContent || '').replace(/\\s+/g, '').replace('（+）', '');
+        if (!name || name in tips) continue;
+        let text = el.dataset.tip || el.getAttribute('title') || '';
+        let strong = [];
+        if (!text) {
+            // 提示框节点：标签内的子节点，或紧跟其后的兄弟节点
+            const sel = tipSelectors.join(',');
+            const sib = el.nextElementSibling;
+            const node = el.querySelector(sel) || (sib && sib.matches(sel) ? sib : null);
+            if (node) {
+                strong = [...node.querySelectorAll('strong')].map(s => s.textContent.trim());
+                text = node.textContent || '';
+            }
+        }
+        tips[name] = text.trim() ? {text: text.trim(), strong: strong} : null;
+    }
+    return tips;
+}"""
+
+# 在同class的术语标签中找文本匹配的下标（空白归一化后优先完全一致，其次包含；未找到返回-1）
+_JS_FIND_TERM = """(els, text) => {
+    const texts = els.map(e => (e.innerText || '').replace(/\\s+/g, ' ').trim());
+    const exact = texts.indexOf(text);
+    return exact >= 0 ? exact : texts.findIndex(t => t.includes(text));
+}"""
+
+# 在标签上直接派发鼠标移入/移出事件，触发或收起提示框（无需真实鼠标输入）
+_JS_SHOW_TIP = """(el) => {
+    const r = el.getBoundingClientRect();
+    const init = {bubbles: true, clientX: r.left + r.width / 2, clientY: r.top + r.height / 2};
+    for (const type of ['mouseover', 'mouseenter', 'mousemove']) el.dispatchEvent(new MouseEvent(type, init));
+}"""
+_JS_HIDE_TIP = """(el) => {
+    for (const type of ['mouseout', 'mouseleave']) el.dispatchEvent(new MouseEvent(type, {bubbles: true}));
+}"""
+
+# 悬停后一次读出提示框内文本：<strong>（术语类型）、其余子节点（描述）、全文（兜底）
+_JS_TIP_TEXTS = """(el) => ({
+    strong: [...el.querySelectorAll('strong')].map(n => n.innerText),
+    other: [...el.querySelectorAll(':not(strong)')].map(n => n.innerText),
+    full: el.innerText
+})"""
+
+# 基础属性表表头 → 阶段字段（按顺序匹配子串）
+_HEADER_KEY = (
+    ("精英0 1级", "elite_0_level_1"),
+    ("精英0 满级", "elite_0_max"),
+    ("精英1 满级", "elite_1_max"),
+    ("精英2 满级", "elite_2_max"),
+    ("信赖加成上限", "trust_bonus"),
+)
+
+def _map_header(header: str) -> str:
+    """表头文本 → 阶段字段（无匹配返回空串）"""
+    for needle, key in _HEADER_KEY:
+        if needle in header:
+            return key
+    return ""
+
+def _iter_visible_parts(td_elem):
+    """逐个产出单元格直接子节点中的可见文本（跳过display:none的span）"""
+    for child in td_elem.contents:
+        if isinstance(child, str):
+            stripped = child.strip()
+            if stripped:
+                yield stripped
+        elif child.name == "span" and "display:none" not in child.get("style", ""):
+            span_text = clean_text(child)
+            if span_text:
+                yield span_text
+
+def _extract_visible_text(td_elem) -> str:
+    """单元格可见文本（以空格连接）"""
+    return " ".join(_iter_visible_parts(td_elem))
+
+def _tip_type(strong_texts, term_name: str) -> str:
+    """提示框<strong>文本 → 术语类型（取冒号前部分，多个以，连接；与术语名相同视为无类型）"""
+    parts = [text.strip().split(":")[0].rstrip("：:") for text in strong_texts]
+    term_type = "，".join(part for part in parts if part) or "无"
+    return "无" if term_type == term_name else term_type
+
+def _tip_key(term_name: str) -> str:
+    """术语名 → 页面内提示框字典的键（与_JS_INLINE_TIPS相同的归一化）"""
+    return _WS_RE.sub("", term_name).replace("（+）", "")
 
 class OperatorDetailParser:
     """干员详情解析器（有状态类封装，维护page/soup）"""
@@ -14,7 +108,26 @@ class OperatorDetailParser:
     _shared_browser = None
     _shared_context = None
     _browser_initialized = False
+    _browser_generation = 0  # 浏览器实例代数：每次启动+1，并发任务据此对同一次崩溃只重启一次
+    _shared_context_closed = False  # 全局上下文已触发close事件（BrowserContext无is_closed方法）
     _lock = asyncio.Lock()  # 并发锁，避免多实例竞争资源
+    _page_pool = None  # 页面池（asyncio.Queue，容量=并发数；元素为可复用Page或None空位）
+    _page_pool_size = 0  # 页面池当前容量（空位+在池/在用页面总数）
+    _CONTEXT_OPTIONS = {
+        "viewport": {"width": 1920, "height": 1080},
+        "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    }
+    # 各解析段落的锚点节点：表格按class集合匹配，标题/容器按(标签名, id)匹配
+    _TABLE_ANCHORS = (
+        ("base", frozenset({"char-base-attr-table"})),  # 基础属性表
+        ("extra", frozenset({"char-extra-attr-table"})),  # 额外属性表
+        ("trait", frozenset({"wikitable", "logo"})),  # 特性/分支表
+    )
+    _ID_ANCHORS = {
+        ("span", "天赋"): "talent_h",
+        ("span", "技能"): "skill_h",
+        ("div", "mw-content-text"): "content",
+    }
 
     # ========== 1. 初始化方法 ==========
     def __init__(self, operator_name: str):
@@ -22,6 +135,9 @@ class OperatorDetailParser:
         self.url = f"{BASE_URL}/w/{self.operator_name}" if self.operator_name else ""
         self.page = None
         self.soup = None
+        self._nodes = {}  # 锚点节点索引（_get_soup建树时单次遍历生成）
+        self._soup_lock = None  # 建树锁（首次并发调用_get_soup时创建）
+        self._context_override = None  # 独立上下文（run_many(isolated=True)时设置；页面不进页面池）
         
         # 从配置读取参数（实例属性）
         self.term_min_length = PLAYWRIGHT_CONFIG["term_filter"]["min_length"]
@@ -38,17 +154,10 @@ class OperatorDetailParser:
         """初始化全局复用的浏览器实例（加锁+状态防护）"""
         async with cls._lock:  # 并发安全
             if cls._browser_initialized:
-                # 双重检查：对象存在 + 有is_closed方法 + 未关闭
-                context_valid = (
-                    cls._shared_context 
-                    and hasattr(cls._shared_context, 'is_closed') 
-                    and not cls._shared_context.is_closed()
-                )
-                if context_valid:
+                if cls._context_alive(cls._shared_context):
                     return cls._shared_context
-                else:
-                    logger.warning("⚠️ 全局上下文无效，清理后重新初始化")
-                    await cls.close_shared_browser()
+                logger.warning("⚠️ 全局上下文无效，清理后重新初始化")
+                await cls._close_unlocked()  # 已持有_lock：asyncio.Lock不可重入，不能调用close_shared_browser
 
             try:
                 cls._shared_playwright = await async_playwright().start()
@@ -56,59 +165,184 @@ class OperatorDetailParser:
                     "--no-sandbox",
                     "--disable-gpu",
                     "--disable-dev-shm-usage",
-                    "--disk-cache-dir=/tmp/playwright-cache",
                     "--max-old-space-size=256",
                     "--memory-pressure-off"
                 ]
-                # 核心修复：直接用配置文件的headless，而非类属性
-                cls._shared_browser = await cls._shared_playwright.chromium.launch(
-                    headless=PLAYWRIGHT_CONFIG["headless"],  # ✅ 修复点：读配置而非cls.headless
-                    args=browser_args,
-                    timeout=60000
-                )
-                cls._shared_context = await cls._shared_browser.new_context(
-                    viewport={"width": 1920, "height": 1080},
-                    user_agent="Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
+                user_data_dir = PLAYWRIGHT_CONFIG["user_data_dir"]
+                if user_data_dir:
+                    # 持久化上下文：Chromium磁盘HTTP缓存跨干员、跨运行复用（浏览器由该上下文持有，无独立Browser对象）
+                    # 磁盘缓存放在user_data_dir内，不能再指向/tmp，否则跨运行复用落空
+                    cls._shared_context = await cls._shared_playwright.chromium.launch_persistent_context(
+                        user_data_dir,
+                        headless=PLAYWRIGHT_CONFIG["headless"],
+                        args=browser_args + ["--disk-cache-size=268435456"],
+                        timeout=60000,
+                        **cls._CONTEXT_OPTIONS
+                    )
+                    await cls._block_resources(cls._shared_context)
+                else:
+                    browser_args.append("--disk-cache-dir=/tmp/playwright-cache")
+                    # 核心修复：直接用配置文件的headless，而非类属性
+                    cls._shared_browser = await cls._shared_playwright.chromium.launch(
+                        headless=PLAYWRIGHT_CONFIG["headless"],  # ✅ 修复点：读配置而非cls.headless
+                        args=browser_args,
+                        timeout=60000
+                    )
+                    cls._shared_context = await cls._new_context()
+                cls._shared_context_closed = False
+                cls._shared_context.on("close", cls._on_shared_context_close)
+                cls._browser_generation += 1
                 cls._browser_initialized = True
                 logger.info("✅ 全局浏览器实例初始化完成（复用模式）")
                 return cls._shared_context
             except Exception as e:
                 logger.error(f"❌ 全局浏览器初始化失败：{str(e)}")
-                await cls.close_shared_browser()
+                await cls._close_unlocked()
                 raise
 
+    @classmethod
+    def _on_shared_context_close(cls, context):
+        """全局上下文close事件（浏览器崩溃/断开时同样触发）"""
+        if context is cls._shared_context:
+            cls._shared_context_closed = True
+
+    @classmethod
+    def _context_alive(cls, context) -> bool:
+        """上下文是否可用：普通上下文看所属浏览器是否仍连接，持久化上下文（browser为None）看close事件"""
+        if context is None or (context is cls._shared_context and cls._shared_context_closed):
+            return False
+        browser = context.browser
+        return browser is None or browser.is_connected()
+
+    @classmethod
+    async def restart_shared_browser(cls, generation: int):
+        """崩溃恢复：仅当全局浏览器仍是调用方出错时那一代、且确已断开时才重启（单个页面出错不影响其他任务）"""
+        async with cls._lock:
+            if generation != cls._browser_generation or cls._context_alive(cls._shared_context):
+                return  # 其他任务已重启过，或浏览器仍存活（只是该页面出错）
+            logger.warning("⚠️ 全局浏览器已断开，重启")
+            await cls._close_unlocked()
+        await cls.init_shared_browser()
+
+    @classmethod
+    async def _block_resources(cls, context):
+        """拦截上下文内无需加载的资源类型（图片/字体/媒体等）及统计/广告请求"""
+        blocked = frozenset(PLAYWRIGHT_CONFIG["blocked_resources"])
+        patterns = PLAYWRIGHT_CONFIG["blocked_url_patterns"]
+        blocked_url = re.compile("|".join(map(re.escape, patterns))) if patterns else None
+        if blocked or blocked_url:
+            async def _handle(route):
+                request = route.request
+                if request.resource_type in blocked or (blocked_url and blocked_url.search(request.url)):
+                    await route.abort()
+                else:
+                    await route.continue_()
+            await context.route("**/*", _handle)
+
+    @classmethod
+    async def _new_context(cls):
+        """在全局浏览器上新建上下文（统一视口/UA，并拦截无需加载的资源类型）"""
+        context = await cls._shared_browser.new_context(**cls._CONTEXT_OPTIONS)
+        await cls._block_resources(context)
+        return context
+
     # ========== 3. 全局浏览器关闭（加锁+属性检查） ==========
     @classmethod
     async def close_shared_browser(cls):
         """关闭全局浏览器实例（加锁+安全关闭）"""
         async with cls._lock:
-            # 关闭上下文（检查对象+方法是否存在）
-            if cls._shared_context and hasattr(cls._shared_context, 'is_closed') and not cls._shared_context.is_closed():
-                try:
-                    await cls._shared_context.close()
-                except Exception as e:
-                    logger.warning(f"⚠️ 关闭上下文时警告：{str(e)}")
-            cls._shared_context = None
+            await cls._close_unlocked()
 
-            # 关闭浏览器
-            if cls._shared_browser and hasattr(cls._shared_browser, 'is_closed') and not cls._shared_browser.is_closed():
-                try:
-                    await cls._shared_browser.close()
-                except Exception as e:
-                    logger.warning(f"⚠️ 关闭浏览器时警告：{str(e)}")
-            cls._shared_browser = None
+    @classmethod
+    async def _close_unlocked(cls):
+        """关闭全局浏览器实例（调用方须已持有_lock）"""
+        # 关闭上下文（已失效的上下文无需再关）
+        if cls._context_alive(cls._shared_context):
+            try:
+                await cls._shared_context.close()
+            except Exception as e:
+                logger.warning(f"⚠️ 关闭上下文时警告：{str(e)}")
+        cls._shared_context = None
 
-            # 停止playwright
-            if cls._shared_playwright:
-                try:
-                    await cls._shared_playwright.stop()
-                except Exception as e:
-                    logger.warning(f"⚠️ 停止Playwright时警告：{str(e)}")
-            cls._shared_playwright = None
+        # 关闭浏览器
+        if cls._shared_browser and cls._shared_browser.is_connected():
+            try:
+                await cls._shared_browser.close()
+            except Exception as e:
+                logger.warning(f"⚠️ 关闭浏览器时警告：{str(e)}")
+        cls._shared_browser = None
 
-            cls._browser_initialized = False
-            logger.info("🔌 全局浏览器实例已关闭")
+        # 停止playwright
+        if cls._shared_playwright:
+            try:
+                await cls._shared_playwright.stop()
+            except Exception as e:
+                logger.warning(f"⚠️ 停止Playwright时警告：{str(e)}")
+        cls._shared_playwright = None
+
+        cls._browser_initialized = False
+        logger.info("🔌 全局浏览器实例已关闭")
+
+    # ========== 页面池（并发解析时每个任务独占一个页面，跨干员复用） ==========
+    @classmethod
+    def _get_page_pool(cls, size: int = None):
+        """获取页面池（容量不足size时补放空位，默认按配置并发数；需在事件循环内调用）"""
+        if cls._page_pool is None:
+            cls._page_pool = asyncio.Queue()
+        size = size or PLAYWRIGHT_CONFIG["concurrency"]
+        for _ in range(size - cls._page_pool_size):
+            cls._page_pool.put_nowait(None)
+        cls._page_pool_size = max(cls._page_pool_size, size)
+        return cls._page_pool
+
+    @staticmethod
+    async def _page_healthy(page) -> bool:
+        """页面健康检查（渲染进程崩溃/卡死时evaluate会失败或超时）"""
+        try:
+            await asyncio.wait_for(page.evaluate("1"), timeout=5)
+            return True
+        except Exception:
+            return False
+
+    async def _acquire_page(self, context):
+        """从页面池取页（空位或浏览器重启后失效的页面，在当前上下文中补开新页）"""
+        pool = self._get_page_pool()
+        page = await pool.get()
+        if page is not None and not page.is_closed() and page.context is context and not await self._page_healthy(page):
+            logger.warning("⚠️ 复用页面无响应，关闭后新开页面")
+            try:
+                await page.close()
+            except Exception:
+                pass
+            page = None
+        if page is None or page.is_closed() or page.context is not context:
+            try:
+                page = await context.new_page()
+            except Exception:
+                pool.put_nowait(None)  # 开页失败也要归还空位，避免池容量泄漏
+                raise
+        return page
+
+    async def release_page(self):
+        """归还当前页面到页面池（已关闭的页面以空位归还）"""
+        if self.page is None:
+            return
+        page, self.page = self.page, None
+        if self._context_override:
+            await page.close()  # 独立上下文的页面随上下文销毁，不归还页面池
+            return
+        if not page.is_closed():
+            try:
+                if not await self._page_healthy(page):
+                    raise RuntimeError("页面无响应")
+                await page.goto("about:blank")  # 丢弃上一个干员页面的DOM/脚本状态后再复用
+            except Exception as e:
+                logger.warning(f"⚠️ 页面重置失败，关闭后以空位归还：{str(e)[:50]}")
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        self._get_page_pool().put_nowait(None if page.is_closed() else page)
 
     # ========== 4. 页面初始化（属性检查+异常防护） ==========
     async def _init_browser_page(self):
@@ -118,66 +352,85 @@ class OperatorDetailParser:
         
         max_retries = 3
         for attempt in range(max_retries):
+            generation = None
             try:
-                # 初始化上下文（加锁确保安全）
-                async with self._lock:
-                    context = await self.init_shared_browser()
-                    # 检查上下文有效性
-                    context_valid = (
-                        context 
-                        and hasattr(context, 'is_closed') 
-                        and not context.is_closed()
-                    )
-                    if not context_valid:
-                        raise Exception("全局上下文无效")
-
-                # 关闭旧页面（安全检查）
-                if self.page and hasattr(self.page, 'is_closed') and not self.page.is_closed():
-                    await self.page.close()
-                self.page = await context.new_page()
+                # 初始化上下文（init_shared_browser内部已加锁；asyncio.Lock不可重入，此处不能再套一层）
+                context = self._context_override or await self.init_shared_browser()
+                generation = self._browser_generation  # 记下本次使用的浏览器代数，出错时据此判断是否已被其他任务重启
+                # 检查上下文有效性
+                if not self._context_alive(context):
+                    raise Exception("全局上下文无效")
+
+                # 从页面池取页（重试时沿用仍有效的页面）
+                if self.page is None or self.page.is_closed():
+                    await self.release_page()
+                    self.page = await (context.new_page() if self._context_override else self._acquire_page(context))
                 
                 # 超时配置
                 self.page.set_default_timeout(self.timeouts["page_load"] or 60000)
                 self.page.set_default_navigation_timeout(self.timeouts["page_load"] or 60000)
                 
                 # 加载页面
+                # 解析所需内容在DOMContentLoaded时已由服务端渲染完毕，无需等load/networkidle
                 await self.page.goto(
                     self.url, 
-                    wait_until="load",
+                    wait_until="domcontentloaded",
                     timeout=60000
                 )
-                await self.page.wait_for_selector("#mw-content-text", timeout=60000)
-                await self.page.wait_for_load_state("networkidle")
-                await asyncio.sleep(1)
+                await self.page.wait_for_selector("#mw-content-text", state="attached", timeout=self.timeouts["page_load"] or 60000)
                 logger.info(f"✅ 浏览器页面初始化完成：{self.url}")
                 return None
                 
             except Exception as e:
                 error_msg = str(e).lower()
-                # 处理崩溃场景
+                # 处理崩溃场景：只有浏览器确已断开才重启，单个页面崩溃/关闭时仅换页重试
                 if "closed" in error_msg or "crashed" in error_msg or "target" in error_msg:
-                    logger.error(f"❌ 浏览器/上下文异常，尝试重启（{attempt+1}/{max_retries}）：{str(e)[:50]}")
-                    await self.close_shared_browser()
-                    await asyncio.sleep(5)
+                    logger.error(f"❌ 浏览器/上下文异常（{attempt+1}/{max_retries}）：{str(e)[:50]}")
+                    try:
+                        await self.release_page()  # 崩溃的页面不再复用（健康检查失败时关闭后以空位归还）
+                    except Exception:
+                        self.page = None
+                    if not self._context_override and generation is not None:
+                        await self.restart_shared_browser(generation)
                 
                 if attempt == max_retries - 1:
                     raise Exception(f"❌ 页面初始化失败，已重试{max_retries}次: {str(e)}")
                 
                 logger.warning(f"⚠️ 页面初始化失败，正在重试 ({attempt + 1}/{max_retries}): {str(e)}")
-                # 关闭当前页面
-                if self.page and hasattr(self.page, 'is_closed') and not self.page.is_closed():
-                    await self.page.close()
-                self.page = None
                 await asyncio.sleep(3)
 
     # ========== 5. 复用soup对象 ==========
     async def _get_soup(self):
-        """内部方法：复用soup对象（避免重复解析页面）"""
-        if not self.soup and self.page:
-            content = await self.page.content()
-            self.soup = BeautifulSoup(content, "lxml")
+        """内部方法：复用soup对象（避免重复解析页面；并发调用时加锁，只建树一次）"""
+        if self.soup or not self.page:
+            return self.soup
+        if self._soup_lock is None:
+            self._soup_lock = asyncio.Lock()
+        async with self._soup_lock:
+            if not self.soup and self.page:
+                # 只取正文容器#mw-content-text的outerHTML建树（导航栏/侧栏/页脚等不参与解析；保留容器本身供锚点索引）
+                content = await self.page.locator("#mw-content-text").evaluate("el => el.outerHTML")
+                self.soup = BeautifulSoup(content, "lxml")
+                self._nodes = self._index_nodes()
         return self.soup
 
+    def _index_nodes(self) -> dict:
+        """单次遍历soup：记录各解析段落的锚点节点（每类取文档中第一个），并收集术语候选span（term_spans）"""
+        nodes = dict.fromkeys([key for key, _ in self._TABLE_ANCHORS] + list(self._ID_ANCHORS.values()))
+        term_spans = []
+        for tag in self.soup.find_all(("table", "span", "div")):
+            if tag.name == "table":
+                classes = set(tag.get("class") or ())
+                key = next((k for k, required in self._TABLE_ANCHORS if required <= classes), None)
+            else:
+                if tag.name == "span" and any("mc-tooltips" in c for c in tag.get("class") or ()):
+                    term_spans.append(tag)
+                key = self._ID_ANCHORS.get((tag.name, tag.get("id")))
+            if key is not None and nodes[key] is None:
+                nodes[key] = tag
+        nodes["term_spans"] = term_spans
+        return nodes
+
     # ========== 6. 解析干员属性 ==========
     async def parse_attrs(self):
         """解析干员属性"""
@@ -189,18 +442,11 @@ class OperatorDetailParser:
             "elite_2_max": {},
             "trust_bonus": {}
         }
-        base_tbl = self.soup.select_one("table.char-base-attr-table")
+        base_tbl = self._nodes.get("base")
         
         if base_tbl:
             headers = [clean_text(th) for th in base_tbl.select("tr:first-child th, tr:first-child td")]
-            key_mapping = [
-                "elite_0_level_1" if "精英0 1级" in h else
-                "elite_0_max" if "精英0 满级" in h else
-                "elite_1_max" if "精英1 满级" in h else
-                "elite_2_max" if "精英2 满级" in h else
-                "trust_bonus" if "信赖加成上限" in h else
-                "" for h in headers
-            ]
+            key_mapping = [_map_header(h) for h in headers]
             attr_mapping = {
                 "生命上限": "max_hp",
                 "攻击": "atk",
@@ -209,7 +455,7 @@ class OperatorDetailParser:
             }
             
             for tr in base_tbl.select("tr")[1:]:
-                tds = [clean_text(td) for td in tr.select("th, td")]
+                tds = [clean_text(td) for td in tr.find_all(("th", "td"), recursive=False)]
                 if len(tds) < 2:
                     continue
                 attr_key = attr_mapping.get(tds[0], tds[0].lower())
@@ -218,7 +464,7 @@ class OperatorDetailParser:
                         base_attrs[key_mapping[idx]][attr_key] = val
 
         extra_attrs = {}
-        extra_tbl = self.soup.select_one("table.char-extra-attr-table")
+        extra_tbl = self._nodes.get("extra")
         if extra_tbl:
             extra_key_map = {
                 "再部署时间": "redployment_time",
@@ -229,12 +475,11 @@ class OperatorDetailParser:
                 "隐藏势力": "hidden_faction"
             }
             for tr in extra_tbl.select("tr"):
-                ths = tr.select("th")
-                tds = tr.select("td")
+                ths = tr.find_all("th", recursive=False)
+                tds = tr.find_all("td", recursive=False)
                 if not ths or not tds:
                     continue
-                th_text = clean_text(ths[0])
-                th_text = th_text.replace('"', '').replace('“', '').replace('”', '').strip()
+                th_text = clean_text(ths[0]).translate(_QUOTE_TBL).strip()
                 td_text = clean_text(tds[0])
                 
                 if th_text in extra_key_map:
@@ -258,7 +503,7 @@ class OperatorDetailParser:
             "branch_description": "",
             "trait_details": ""
         }
-        trait_tbl = self.soup.select_one("table.wikitable.logo")
+        trait_tbl = self._nodes.get("trait")
         
         if trait_tbl:
             rows = trait_tbl.select("tr")
@@ -267,7 +512,7 @@ class OperatorDetailParser:
                 result["branch_name"] = clean_text(tds[0]) if tds else ""
                 result["branch_description"] = clean_text(tds[1]) if len(tds) > 1 else ""
             
-            branch_row = trait_tbl.find("tr", string=re.compile("分支信息"))
+            branch_row = trait_tbl.find("tr", string=_BRANCH_RE)
             if branch_row:
                 next_row = branch_row.find_next_sibling("tr")
                 if next_row:
@@ -280,7 +525,7 @@ class OperatorDetailParser:
         """解析干员天赋"""
         await self._get_soup()
         talents = []
-        talent_header = self.soup.find("span", id="天赋")
+        talent_header = self._nodes.get("talent_h")
         if not talent_header:
             logger.debug("⚠️  未找到天赋区域")
             return talents
@@ -292,17 +537,17 @@ class OperatorDetailParser:
                 "remarks": "",
                 "details": []
             }
-            rows = table.find_all("tr")
+            # 先一次性收集每行的直接子单元格（行仍递归查找：MediaWiki表格带<tbody>）
+            rows = [(row.find_all("td", recursive=False), row.find("th", recursive=False)) for row in table.find_all("tr")]
+            remark_idx = len(rows) - 2  # 倒数第二行为备注标题行
             is_remark_section = False
             remark_text = ""
 
-            for idx, row in enumerate(rows):
+            for idx, (tds, th) in enumerate(rows):
                 if idx == 0:
                     continue
-                tds = row.find_all("td")
-                th = row.find("th")
 
-                if idx == len(rows) - 2 and th:
+                if idx == remark_idx and th:
                     is_remark_section = True
                     continue
                 if not tds:
@@ -345,25 +590,12 @@ class OperatorDetailParser:
         """解析干员技能"""
         await self._get_soup()
         skills = []
-        skill_header = self.soup.find("span", id="技能")
+        skill_header = self._nodes.get("skill_h")
         
         if not skill_header:
             logger.debug("⚠️  未找到技能区域")
             return skills
 
-        def extract_visible_text(td_elem) -> str:
-            visible_parts = []
-            for child in td_elem.contents:
-                if isinstance(child, str):
-                    stripped = child.strip()
-                    if stripped:
-                        visible_parts.append(stripped)
-                elif child.name == "span" and "display:none" not in child.get("style", ""):
-                    span_text = clean_text(child)
-                    if span_text:
-                        visible_parts.append(span_text)
-            return " ".join(visible_parts)
-
         def parse_single_skill(table, skill_idx: int) -> dict:
             skill = {
                 "skill_number": skill_idx,
@@ -373,11 +605,11 @@ class OperatorDetailParser:
                 "remark": "",
                 "skill_levels": []
             }
-            rows = table.find_all("tr")
+            rows = [(row, row.find_all("td", recursive=False)) for row in table.find_all("tr")]
+            remark_idx = len(rows) - 2  # 倒数第二行为备注标题行
             is_remark = False
 
-            for idx, row in enumerate(rows):
-                tds = row.find_all("td")
+            for idx, (row, tds) in enumerate(rows):
                 if not tds:
                     continue
 
@@ -394,14 +626,14 @@ class OperatorDetailParser:
                     if len(tds) >= 5:
                         skill["skill_levels"].append({
                             "level": clean_text(tds[0]),
-                            "description": extract_visible_text(tds[1]),
+                            "description": _extract_visible_text(tds[1]),
                             "initial_sp": clean_text(tds[2]),
                             "sp_cost": clean_text(tds[3]),
                             "duration": clean_text(tds[4])
                         })
                     continue
 
-                if idx == len(rows) - 2 and row.find("th"):
+                if idx == remark_idx and row.find("th", recursive=False):
                     is_remark = True
                     continue
                 if is_remark:
@@ -447,6 +679,73 @@ class OperatorDetailParser:
         logger.debug(f"📊 解析到技能数量：{len(skills)}")
         return skills
 
+    async def _hover_tip(self, term_tag, term_name: str, idx: int, total_terms: int):
+        """悬停术语标签读取提示框，返回 (术语类型, 描述)；定位不到或无提示框时返回None"""
+        class_list = term_tag.get("class", [])
+        valid_classes = [c for c in class_list if "mc-tooltips" in c]
+        if not valid_classes:
+            logger.info(f"⏭️  术语{idx}/{total_terms}：跳过（无有效class）→ 名称：{term_name}")
+            return None
+
+        term_class = next((c for c in valid_classes if c != "mc-tooltips"), valid_classes[0])  # 优先专属class，缩小定位范围
+        # 只按class定位，文本在浏览器端一次比对（优先完全一致，其次包含），无需转义术语名拼:has-text
+        all_locator = self.page.locator(f"span.{term_class}")
+        match_index = await all_locator.evaluate_all(_JS_FIND_TERM, term_name)
+        if match_index < 0:
+            logger.info(f"❌ 术语{idx}/{total_terms}：失败（页面中未定位到标签）→ 名称：{term_name}")
+            return None
+        locator = all_locator.nth(match_index)
+
+        # 先在页面内直接派发鼠标事件触发提示框（单次往返，无需滚动/真实鼠标）；未出现再回退到真实悬停
+        # 只认可见的提示框：DOM中可能残留已收起/隐藏的旧提示框节点，取.first会等在它上面
+        tip_any = self.page.locator(", ".join(self.tooltip_selectors)).locator("visible=true").first
+        tip_timeout = (self.wait_times["tooltip_render"] or 0.5) * 1000
+        real_hover = False
+        await locator.evaluate(_JS_SHOW_TIP)
+        try:
+            await tip_any.wait_for(state="visible", timeout=tip_timeout)
+        except PlaywrightTimeoutError:
+            real_hover = True
+            await locator.wait_for(state="visible", timeout=self.timeouts["locator_wait"] or 10000)
+            await locator.scroll_into_view_if_needed()
+            await locator.hover(force=True)
+            # 轮询等待任一提示框出现（最长tooltip_render秒），出现即继续，不再固定sleep
+            try:
+                await tip_any.wait_for(state="visible", timeout=tip_timeout)
+            except PlaywrightTimeoutError:
+                pass  # 未出现时交由下方逐个选择器检查并记录失败
+
+        tip = None
+        for tip_selector in self.tooltip_selectors:
+            tip_locator = self.page.locator(tip_selector).locator("visible=true").first
+            if await tip_locator.count() > 0:
+                # 一次evaluate读出<strong>、其余子节点与全文，替代逐个handle的inner_text往返
+                texts = await tip_locator.evaluate(_JS_TIP_TEXTS, timeout=self.timeouts["text_extract"] or 5000)
+                term_type = _tip_type(texts["strong"], term_name)
+
+                content_parts = [text.strip() for text in texts["other"] if text and text.strip()]
+                term_desc = "\n".join(content_parts)
+
+                if not term_desc:
+                    full_text = texts["full"] or ""
+                    if term_type != "无":
+                        full_text = full_text.replace(f"{term_type}：", "").replace(f"{term_type}:", "").replace(term_type, "")
+                    term_desc = full_text.strip()
+                tip = (term_type, term_desc)
+                break
+
+        if tip is None:
+            logger.info(f"❌ 术语{idx}/{total_terms}：失败（未找到提示框）→ 名称：{term_name}")
+
+        # 收起提示框：派发移出事件；真实悬停过的再把鼠标移开
+        try:
+            await locator.evaluate(_JS_HIDE_TIP)
+            if real_hover:
+                await self.page.mouse.move(100, 100)
+        except Exception as e:
+            logger.warning(f"⚠️ 收起提示框失败，继续下一个术语: {str(e)[:30]}")
+        return tip
+
     # ========== 10. 解析干员术语（优化资源消耗） ==========
     async def parse_terms(self):
         """解析干员相关术语"""
@@ -457,106 +756,73 @@ class OperatorDetailParser:
         total_failed = 0
 
         try:
-            content_div = self.soup.find("div", id="mw-content-text")
+            content_div = self._nodes.get("content")
             if not content_div:
                 logger.warning("⚠️  未找到核心内容区，跳过术语提取")
                 return terms
 
-            term_tags = content_div.find_all(
-                lambda tag: tag.name == "span"
-                and tag.get("class")
-                and any("mc-tooltips" in c for c in tag.get("class"))
-                and len(clean_text(tag).strip()) >= self.term_min_length
-                and not clean_text(tag).strip().isdigit()
-            )
+            # 候选span已在建树时随锚点索引一并收集，这里只按文本过滤；每个标签只clean_text一次
+            # 同一术语在页面中多次出现且共用专属class（如mc-tooltips-xxx）：按(class, 名称)去重，只保留首个，避免重复悬停
+            unique_terms_by_key = {}
+            for tag in self._nodes["term_spans"]:
+                if not any(parent is content_div for parent in tag.parents):
+                    continue  # 不在内容区内，或建树后随自身/祖先节点被其他解析段落移出文档（extract/replace_with）
+                name = clean_text(tag).strip()
+                if len(name) < self.term_min_length or name.isdigit():
+                    continue
+                # 取专属class（非通用的mc-tooltips）；悬停时按class定位后再比对文本，故以(class, 名称)为键
+                term_class = next((c for c in tag.get("class") or () if "mc-tooltips" in c and c != "mc-tooltips"), "")
+                unique_terms_by_key.setdefault((term_class, name), (tag, name))
+            term_tags = list(unique_terms_by_key.values())
             total_terms = len(term_tags)
             logger.info(f"\n🔍 术语提取开始：共找到 {total_terms} 个有效潜在术语标签")
             if total_terms == 0:
                 return terms
 
             try:
-                await self.page.evaluate("() => document.title")
+                # 页面以domcontentloaded返回时提示框脚本可能尚未执行：取提示框前等load事件（超时则照常继续）
+                await self.page.wait_for_load_state("load", timeout=self.timeouts["locator_wait"] or 5000)
+            except PlaywrightTimeoutError:
+                logger.warning("⚠️ 等待页面load事件超时，提示框脚本可能未就绪，继续提取术语")
+
+            try:
+                # 一次evaluate取回所有已渲染在DOM中的提示框内容（兼作页面状态检查），只对取不到的术语悬停
+                inline_tips = await self.page.evaluate(_JS_INLINE_TIPS, self.tooltip_selectors)
             except Exception as e:
                 logger.error(f"❌ 页面状态检查失败，跳过术语提取：{str(e)[:50]}")
                 return terms
+            logger.debug(f"📊 页面内已渲染提示框：{sum(1 for tip in inline_tips.values() if tip)}个")
 
-            max_terms = min(total_terms, 20)
-            processed_terms = 0
+            max_terms = 20  # 悬停取提示框较慢，最多悬停的术语数
+            hovered_terms = 0
 
-            for idx, term_tag in enumerate(term_tags, 1):
-                if processed_terms >= max_terms:
-                    logger.info(f"⏭️ 已达到最大处理数量 {max_terms}，停止处理")
-                    break
-                    
-                term_name = clean_text(term_tag).strip()
+            for idx, (term_tag, term_name) in enumerate(term_tags, 1):
                 if not term_name or term_name in term_seen:
                     logger.info(f"⏭️  术语{idx}/{total_terms}：跳过（重复/无效）→ 名称：{term_name}")
                     continue
 
                 try:
-                    class_list = term_tag.get("class", [])
-                    valid_classes = [c for c in class_list if "mc-tooltips" in c]
-                    if not valid_classes:
-                        logger.info(f"⏭️  术语{idx}/{total_terms}：跳过（无有效class）→ 名称：{term_name}")
-                        total_failed += 1
-                        continue
-
-                    term_class = valid_classes[0]
-                    safe_name = term_name.replace("'", "\\'").replace('"', '\\"').replace("\\", "\\\\")
-                    css_selector = f"span.{term_class}:has-text('{safe_name}')"
-                    locator = self.page.locator(css_selector).first
-
-                    match_count = await self.page.locator(css_selector).count()
-                    if match_count > 1:
-                        logger.debug(f"⚠️  术语{term_name}匹配{match_count}个元素，取第一个")
-                        logger.info(f"⚠️  术语{idx}/{total_terms}：定位器匹配{match_count}个元素 → 名称：{term_name}")
-
-                    await locator.wait_for(state="visible", timeout=self.timeouts["locator_wait"] or 10000)
-                    await locator.scroll_into_view_if_needed()
-                    await locator.hover(force=True)
-                    await asyncio.sleep(self.wait_times["tooltip_render"] or 0.5)
-
-                    term_type = "无"
-                    term_desc = ""
-                    tip_found = False
-
-                    for tip_selector in self.tooltip_selectors:
-                        tip_locator = self.page.locator(tip_selector).first
-                        if await tip_locator.count() > 0:
-                            tip_found = True
-                            strong_handles = await tip_locator.locator("strong").all()
-                            strong_texts = []
-                            for handle in strong_handles:
-                                text = await handle.inner_text(timeout=self.timeouts["text_extract"] or 5000)
-                                clean_text_val = text.strip().split(":")[0].rstrip("：:")
-                                if clean_text_val:
-                                    strong_texts.append(clean_text_val)
-                            term_type = "，".join(strong_texts) if strong_texts else "无"
-                            if term_type == term_name:
-                                term_type = "无"
-
-                            content_handles = await tip_locator.locator(":not(strong)").all()
-                            content_parts = []
-                            for handle in content_handles:
-                                text = await handle.inner_text(timeout=self.timeouts["text_extract"] or 5000)
-                                clean_text_val = text.strip()
-                                if clean_text_val:
-                                    content_parts.append(clean_text_val)
-                            term_desc = "\n".join(content_parts) if content_parts else ""
-
-                            if not term_desc:
-                                full_text = await tip_locator.inner_text(timeout=self.timeouts["text_extract"] or 5000)
-                                if term_type != "无":
-                                    full_text = full_text.replace(f"{term_type}：", "").replace(f"{term_type}:", "").replace(term_type, "")
-                                term_desc = full_text.strip()
-                            break
-
-                    if not tip_found:
-                        logger.info(f"❌ 术语{idx}/{total_terms}：失败（未找到提示框）→ 名称：{term_name}")
-                        total_failed += 1
-                        continue
+                    formatted_desc = ""
+                    inline = inline_tips.get(_tip_key(term_name))
+                    if inline:
+                        # 页面内已有提示框内容：描述够长时直接使用，无需悬停（过短时仍回退到悬停）
+                        term_type = _tip_type(inline["strong"], term_name)
+                        term_desc = inline["text"]
+                        for strong_text in inline["strong"]:
+                            term_desc = term_desc.replace(strong_text, "", 1)
+                        formatted_desc = _WS_RE.sub("\n", term_desc.strip()).strip()
+                    if len(formatted_desc) < self.desc_min_length:
+                        if hovered_terms >= max_terms:
+                            logger.info(f"⏭️  术语{idx}/{total_terms}：跳过（悬停数已达上限{max_terms}）→ 名称：{term_name}")
+                            continue
+                        hovered_terms += 1
+                        tip = await self._hover_tip(term_tag, term_name, idx, total_terms)
+                        if tip is None:
+                            total_failed += 1
+                            continue
+                        term_type, term_desc = tip
+                        formatted_desc = _WS_RE.sub("\n", term_desc).strip()
 
-                    formatted_desc = re.sub(r"\s+", "\n", term_desc).strip()
                     if len(formatted_desc) < self.desc_min_length:
                         logger.info(f"⏭️  术语{idx}/{total_terms}：跳过（描述过短）→ 名称：{term_name}")
                         total_failed += 1
@@ -572,23 +838,13 @@ class OperatorDetailParser:
                         total_success += 1
                         logger.info(f"✅ 术语{idx}/{total_terms}：成功 → 名称：{term_name} | 类型：{term_type} | 描述长度：{len(formatted_desc)}字")
 
-                    processed_terms += 1
-
-                    try:
-                        await self.page.mouse.move(100, 100)
-                        await asyncio.sleep(0.1)
-                    except Exception as e:
-                        logger.warning(f"⚠️ 鼠标移动失败，继续下一个术语: {str(e)[:30]}")
-
                 except PlaywrightTimeoutError:
                     logger.info(f"❌ 术语{idx}/{total_terms}：失败（超时）→ 名称：{term_name}")
                     total_failed += 1
-                    processed_terms += 1
                     continue
                 except AttributeError as e:
                     logger.info(f"❌ 术语{idx}/{total_terms}：失败（属性错误）→ 名称：{term_name} | 错误：{str(e)[:50]}")
                     total_failed += 1
-                    processed_terms += 1
                     continue
                 except Exception as e:
                     error_msg = str(e).lower()
@@ -597,7 +853,6 @@ class OperatorDetailParser:
                         break
                     logger.info(f"❌ 术语{idx}/{total_terms}：失败（未知错误）→ 名称：{term_name} | 错误：{str(e)[:50]}")
                     total_failed += 1
-                    processed_terms += 1
                     continue
 
         except Exception as e:
@@ -642,8 +897,8 @@ class OperatorDetailParser:
         safe_filename = clean_filename(self.operator_name)
         output_path = f"{JSON_OUTPUT_DIR}/{safe_filename}.json"
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            # 序列化+写盘放到线程中执行，避免并发解析时阻塞事件循环
+            await asyncio.to_thread(dump_json, result, output_path)
             logger.info(f"✅ 成功保存干员详情: {output_path}")
         except IOError as e:
             logger.error(f"❌ 保存文件失败：{str(e)}")
@@ -677,22 +932,53 @@ class OperatorDetailParser:
             logger.error(f"❌ 解析错误：{str(e)[:100]}")
             return None
         finally:
-            # 安全关闭页面
-            if self.page and hasattr(self.page, 'is_closed') and not self.page.is_closed():
-                await self.page.close()
-                self.page = None
-                logger.info("🔌 浏览器页面已关闭（浏览器实例复用）")
+            # 页面归还页面池（浏览器实例与页面均复用）
+            if self.page is not None:
+                await self.release_page()
+                logger.info("🔌 浏览器页面已归还页面池")
 
-# 独立执行入口
+    # ========== 14. 批量并发解析 ==========
+    @classmethod
+    async def run_many(cls, operator_names: list[str], concurrency: int = None, isolated: bool = False) -> dict:
+        """共享全局浏览器并发解析多个干员（信号量限制同时打开的页面数），返回 {干员名: 解析结果或None}
+        isolated=True时每个干员在独立上下文中解析（Cookie/存储互不影响），解析完即关闭该上下文"""
+        concurrency = concurrency or PLAYWRIGHT_CONFIG["concurrency"]
+        sem = asyncio.Semaphore(concurrency)
+        cls._get_page_pool(concurrency)  # 页面池按调用方并发数扩容，否则大于配置并发数的部分只能排队等页
+        await cls.init_shared_browser()
+        if isolated and cls._shared_browser is None:
+            logger.warning("⚠️ 持久化上下文模式下无法新建独立上下文，改为共享上下文解析")
+            isolated = False
+
+        async def run_one(name):
+            async with sem:
+                parser = cls(name)
+                if not isolated:
+                    return await parser.run()
+                parser._context_override = await cls._new_context()
+                try:
+                    return await parser.run()
+                finally:
+                    await parser._context_override.close()
+
+        results = await asyncio.gather(*(run_one(name) for name in operator_names), return_exceptions=True)
+        output = {}
+        for name, result in zip(operator_names, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ 干员 {name} 解析失败：{str(result)[:100]}")
+                result = None
+            output[name] = result
+        logger.info(f"📊 批量解析完成：成功 {sum(r is not None for r in output.values())}/{len(operator_names)}")
+        return output
+
+# 独立执行入口（可传多个干员名，并发解析）
 if __name__ == "__main__":
     import sys
-    operator_name = "焰影苇草" if len(sys.argv) < 2 else sys.argv[1]
+    operator_names = sys.argv[1:] or ["焰影苇草"]
     
     async def main():
         try:
-            parser = OperatorDetailParser(operator_name)
-            await parser.init_shared_browser()
-            await parser.run()
+            await OperatorDetailParser.run_many(operator_names)
         finally:
             await OperatorDetailParser.close_shared_browser()
     
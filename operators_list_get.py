@@ -1,62 +1,102 @@
 # operators_list_get.py
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import hashlib
+import os
+import sys
 import time
-import json
+from dataclasses import dataclass, asdict
 import requests
-from bs4 import BeautifulSoup
-from config import HEADERS, OPERATOR_LIST_CONFIG, JSON_OUTPUT_DIR
-from utils import logger, ensure_output_dir
+import lxml.html
+try:
+    from pypinyin import lazy_pinyin  # 可选依赖：中文名按拼音排序
+except ImportError:
+    lazy_pinyin = None
+from config import OPERATOR_LIST_CONFIG, JSON_OUTPUT_DIR, HTTP_CACHE_DIR
+from utils import logger, ensure_output_dir, cached_get, dump_json
+
+@dataclass
+class Operator:
+    """干员一览记录（__slots__紧凑存储，仅在写JSON/入库时转dict）"""
+    __slots__ = ("name_cn", "rarity", "profession", "sub_profession", "faction", "gender", "position", "tags")
+    name_cn: str
+    rarity: str
+    profession: str
+    sub_profession: str
+    faction: str
+    gender: str
+    position: str
+    tags: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+# PRTS页面固定UTF-8：显式指定编码，不依赖meta charset嗅探（缺失或经代理改写时中文会乱码）
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+# 取值种类很少的字段：解析时intern，所有干员共享同一str对象
+_INTERNED_FIELDS = frozenset({"rarity", "profession", "sub_profession", "faction", "gender", "position"})
 
 class OperatorListCrawler:
     """干员一览爬取器（轻量类封装，无状态）"""
     def __init__(self):
         self.url = OPERATOR_LIST_CONFIG["url"]
-        self.headers = HEADERS
         self.attr_mapping = OPERATOR_LIST_CONFIG["attr_mapping"]
+        self.attr_items = tuple(self.attr_mapping.items())  # (原始属性, 规范字段)，解析时单次遍历
         self.output_dir = JSON_OUTPUT_DIR
         self.output_filename = OPERATOR_LIST_CONFIG["json_output"]
+        self.sort_output = OPERATOR_LIST_CONFIG["sort_output"]
+        self.digest_path = os.path.join(HTTP_CACHE_DIR, "operators_list.sha256")  # 上次成功入库时的页面哈希
+        self.html_digest = None
 
-    def fetch(self) -> str:
-        """抓取干员一览页面HTML"""
+    def fetch(self) -> bytes:
+        """抓取干员一览页面HTML（原始字节）"""
         try:
-            resp = requests.get(self.url, headers=self.headers, timeout=30)
-            resp.raise_for_status()
-            resp.encoding = 'utf-8'
+            html = cached_get(self.url, timeout=30)  # 页面未变更时走304+本地缓存
             logger.info(f"✅ 成功获取干员一览页面：{self.url}")
-            return resp.text
+            return html
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ 网络请求失败：{str(e)}（检查网络或URL是否有效）")
             raise
 
-    def parse(self, html: str) -> list[dict]:
+    def parse(self, html: bytes) -> list[Operator]:
         """解析干员一览数据"""
-        soup = BeautifulSoup(html, 'lxml')
-        data_container = soup.select_one('div#filter-data')
-        if not data_container:
+        # 直接用lxml（libxml2）从字节建树（按UTF-8解码），省去bs4 Tag包装层
+        root = lxml.html.fromstring(html, parser=_HTML_PARSER)
+        try:
+            data_container = root.get_element_by_id('filter-data')
+        except KeyError:
             raise RuntimeError('❌ 页面结构变更：未找到核心数据容器 <div id="filter-data">')
         
         ops_list = []
         # 遍历每个干员的div节点（仅直接子节点，避免递归）
-        for op_div in data_container.find_all('div', recursive=False):
-            # 提取原始属性值
-            raw_data = {attr: op_div.get(attr, '').strip() for attr in self.attr_mapping.keys()}
+        for op_div in data_container.iterchildren('div'):
+            # 提取属性值并直接映射为规范的英文字段（.attrib直接读取libxml2节点属性）
+            get = op_div.attrib.get
+            op_data = {field: (get(attr) or '').strip() for attr, field in self.attr_items}
             
             # 关键修正：稀有度+1（PRTS原始数据是0-5，对应1-6星）
-            raw_rarity = raw_data['data-rarity'] or '0'
-            raw_data['data-rarity'] = str(int(raw_rarity) + 1)
-            
-            # 映射为规范的英文字段
-            op_data = {self.attr_mapping[old_key]: value for old_key, value in raw_data.items()}
-            ops_list.append(op_data)
+            op_data['rarity'] = str(int(op_data['rarity'] or '0') + 1)
+            for field in _INTERNED_FIELDS:
+                op_data[field] = sys.intern(op_data[field])
+            ops_list.append(Operator(**op_data))
         
         logger.info(f"📊 解析完成：共提取 {len(ops_list)} 名干员基础信息")
         return ops_list
 
-    def save(self, ops_list: list[dict]):
+    @staticmethod
+    def _sorted(ops_list: list[Operator]) -> list[Operator]:
+        """按（稀有度降序, 中文名拼音升序）排序，每个干员只计算一次排序键"""
+        name_key = lazy_pinyin if lazy_pinyin else (lambda name: name)
+        keyed = [((-int(op.rarity or 0), name_key(op.name_cn)), op) for op in ops_list]
+        keyed.sort(key=lambda pair: pair[0])
+        return [op for _, op in keyed]
+
+    def save(self, ops_list: list[Operator]):
         """保存干员一览数据到JSON"""
         # 排序规则：稀有度降序（6星在前）→ 中文名升序（拼音排序）
-        # ops_list.sort(key=lambda x: (-int(x['rarity']), x['name_cn']))
+        if self.sort_output:
+            ops_list = self._sorted(ops_list)
         
         # 构造最终的JSON数据结构
         final_json = {
@@ -65,7 +105,7 @@ class OperatorListCrawler:
                 "total_operators": len(ops_list),
                 "data_source": self.url
             },
-            "operators": ops_list  # 干员数据列表（核心数据）
+            "operators": [op.to_dict() for op in ops_list]  # 干员数据列表（核心数据）
         }
         
         # 确保输出目录存在
@@ -73,17 +113,35 @@ class OperatorListCrawler:
         output_path = f"{self.output_dir}/{self.output_filename}"
         
         # 写入JSON文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(final_json, f, ensure_ascii=False, indent=2)
+        dump_json(final_json, output_path)
         
         logger.info(f"✅ 干员一览数据保存完成！文件路径：{output_path}")
         logger.info(f"📊 抓取统计：共 {len(ops_list)} 名干员")
 
-    def run(self) -> list[dict]:
-        """一键执行：抓取→解析→保存"""
+    def _last_digest(self):
+        """读取上次成功入库时的页面哈希"""
+        try:
+            with open(self.digest_path, encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def mark_synced(self):
+        """记录本次页面哈希（调用方入库成功后调用，下次页面未变更时run可直接跳过）"""
+        if self.html_digest:
+            os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+            with open(self.digest_path, "w", encoding="utf-8") as f:
+                f.write(self.html_digest)
+
+    def run(self, skip_unchanged=False):
+        """一键执行：抓取→解析→保存（skip_unchanged=True且页面哈希与上次入库时一致时返回None）"""
         logger.info("=== 开始抓取PRTS干员一览数据 ===")
         try:
             html = self.fetch()
+            self.html_digest = hashlib.sha256(html).hexdigest()
+            if skip_unchanged and self.html_digest == self._last_digest():
+                logger.info("♻️ 干员一览页面未变更，跳过解析与保存")
+                return None
             ops_data = self.parse(html)
             self.save(ops_data)
             return ops_data
@@ -1,9 +1,7 @@
 # terms_parse.py
-import requests
-import json
 from bs4 import BeautifulSoup
 from config import TERM_STATIC_URL, HEADERS, JSON_OUTPUT_DIR
-from utils import logger, clean_text, deduplicate_terms, ensure_output_dir
+from utils import logger, clean_text, deduplicate_terms, ensure_output_dir, get_session, dump_json
 
 class TermStaticCrawler:
     """静态术语爬取器（轻量类封装，无状态）"""
@@ -17,7 +15,7 @@ class TermStaticCrawler:
     def fetch(self) -> str:
         """抓取术语页面HTML"""
         try:
-            response = requests.get(self.url, headers=self.headers, timeout=30)
+            response = get_session().get(self.url, headers=self.headers, timeout=30)
             response.raise_for_status()  # 捕获HTTP错误
             response.encoding = "utf-8"
             logger.info(f"✅ 成功抓取术语页面：{self.url}")
@@ -69,8 +67,7 @@ class TermStaticCrawler:
         """保存术语到JSON（确保目录存在）"""
         ensure_output_dir()
         output_path = f"{self.output_dir}/{self.output_filename}"
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(terms, f, ensure_ascii=False, indent=2)
+        dump_json(terms, output_path)  # 优先orjson直接写字节
         logger.info(f"✅ 术语已保存到 {output_path}")
 
     def run(self) -> list[dict]:
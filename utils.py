@@ -1,10 +1,21 @@
 # utils.py
 import re
 import string
+import asyncio
+import atexit
+import functools
+import hashlib
+import json
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
-from config import LOG_FILE, JSON_OUTPUT_DIR
+try:
+    import orjson  # 可选依赖：C实现的JSON序列化，未安装时回退标准库json
+except ImportError:
+    orjson = None
+from config import LOG_FILE, JSON_OUTPUT_DIR, HEADERS, HTTP_CACHE_DIR
 
 # ========== 日志工具（替代手写log_debug，更规范） ==========
 def init_logger():
@@ -24,13 +35,104 @@ def init_logger():
     ch = logging.StreamHandler()
     ch.setFormatter(logging.Formatter("%(levelname)s | %(message)s"))
     
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    # 文件/控制台写入交给后台线程，入库等热循环中的日志调用只做入队
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, fh, ch, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # 退出前刷完队列中的日志
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False  # 避免再经由root logger重复输出
     return logger
 
 # 初始化全局logger
 logger = init_logger()
 
+# ========== HTTP会话（进程内共享keep-alive连接池） ==========
+@functools.cache
+def get_session():
+    """获取全局requests.Session（复用TCP+TLS连接，自带失败重试；首次调用时才导入requests）"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def cached_get(url: str, timeout=30) -> bytes:
+    """条件GET（ETag/Last-Modified落盘缓存，服务端返回304时直接复用本地副本）；返回原始字节，由解析器自行解码"""
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    body_path = os.path.join(HTTP_CACHE_DIR, f"{key}.html")
+    meta_path = os.path.join(HTTP_CACHE_DIR, f"{key}.meta.json")
+
+    headers = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = get_session().get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        logger.info(f"♻️ 页面未变更，复用本地缓存：{url}")
+        with open(body_path, "rb") as f:
+            return f.read()
+
+    resp.raise_for_status()
+    body = resp.content  # 不经resp.text解码，省去一次完整的str拷贝
+    with open(body_path, "wb") as f:
+        f.write(body)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified")
+        }, f)
+    return body
+
+# ========== 异步限速（令牌桶） ==========
+class AsyncRateLimiter:
+    """异步令牌桶限速器（允许突发max_rate次，长期速率不超过max_rate/time_period）"""
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = max_rate
+        self._last = None
+        self._lock = None  # 首次acquire时在运行中的事件循环内创建
+
+    async def acquire(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._last is not None:
+                    refill = (now - self._last) * self.max_rate / self.time_period
+                    self._tokens = min(self.max_rate, self._tokens + refill)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
 # ========== 文本处理工具 ==========
 def clean_text(tag, replace_plus=True, handle_br=False) -> str:
     """统一文本清理函数（兼容字符串/BeautifulSoup元素，不破坏原有逻辑）"""
@@ -82,6 +184,15 @@ def ensure_output_dir():
     """确保输出目录存在（避免保存文件时报错）"""
     os.makedirs(JSON_OUTPUT_DIR, exist_ok=True)
 
+def dump_json(data, path: str):
+    """写JSON文件（UTF-8、缩进2；优先orjson，未安装时回退json）"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))  # 非str键与json一样转为字符串
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
 # ========== 数据去重工具 ==========
 def deduplicate_terms(terms: list[dict], key="term_name") -> list[dict]:
     """术语去重（通用）"""